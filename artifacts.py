@@ -0,0 +1,73 @@
+"""Eğitim çıktılarını (modeller, grafikler) arka planda yazan kuyruk.
+
+Eğitim döngüsü sadece anlık görüntüleri (genom ve geçmiş kopyaları) kuyruğa
+koyar; dosya yazma ve grafik çizme ayrı bir iş parçacığında yapılır. İşler
+sırayla çalışır, böylece aynı dosyaya yapılan eklemeler sıralarını korur.
+"""
+import os
+import queue
+import threading
+
+def ensure_dir(directory):
+    """directory yoksa (ara dizinleriyle) oluştur; boş yol mevcut dizindir"""
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+class ArtifactWriter:
+    """Çıktı işlerini sırayla arka planda çalıştırır.
+
+    Kuyruk sınırlıdır (max_pending): yazıcı geride kalırsa submit() yer açılana
+    kadar bekler, bekleyen anlık görüntüler bellekte birikmez. replace_pending
+    açıksa beklemek yerine kuyruktaki en eski iş atılır; sadece en yeni durumun
+    önemli olduğu işler (kontrol noktaları) için kullanılır. Bir işte oluşan
+    ilk hata sonraki submit() veya close() çağrısında yükseltilir.
+    """
+    def __init__(self, max_pending=8, replace_pending=False):
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.replace_pending = replace_pending
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            function, args, kwargs = job
+            try:
+                function(*args, **kwargs)
+            except Exception as e:
+                if self.error is None:
+                    self.error = e
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def submit(self, function, *args, **kwargs):
+        """function(*args, **kwargs) çağrısını arka planda çalıştırılmak üzere kuyruğa ekle
+
+        Argümanlar kopyalanmaz; çağıran, sonradan değişmeyecek anlık görüntüler vermelidir.
+        """
+        self._raise_error()
+        job = (function, args, kwargs)
+        if not self.replace_pending:
+            self.queue.put(job)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(job)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def close(self):
+        """Bekleyen tüm işleri bitir ve iş parçacığını durdur"""
+        self.queue.put(None)
+        self.thread.join()
+        self._raise_error()
@@ -0,0 +1,291 @@
+"""Simülasyon ve evrim hızı için tekrarlanabilir kıyaslama (benchmark) aracı.
+
+Tüm ölçümler sabit tohumlarla (aynı genomlar, aynı boru parkuru) yapılır, bu
+yüzden iki sürüm arasındaki fark sadece kodun hızını yansıtır. Sonuçlar JSON
+olarak yazılır ve isteğe bağlı olarak kayıtlı bir taban çizgisiyle
+karşılaştırılır; eşikten fazla kötüleşen ölçümler işaretlenir ve program 1 ile
+çıkar.
+
+Kullanım:
+    python benchmark.py --output bench/results.json
+    python benchmark.py --baseline bench/baseline.json --threshold 0.1
+    python benchmark.py --quick --save_baseline bench/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+from game import Bird, FlappyBird, GameMode
+from neural_network import EvolutionaryAlgorithm
+from vector_game import VectorFlappyBird
+from vector_env import FlappyVectorEnv
+import jit_engine
+from artifacts import ensure_dir
+
+GENOME_SEED = 1234
+COURSE_SEED = 42
+LAYER_SIZES = (8, 24, 1)
+
+POPULATION_SIZES = (10, 100, 1000, 10000, 100000)
+QUICK_POPULATION_SIZES = (10, 100, 1000)
+REFERENCE_MAX_POPULATION = 1000  # FlappyBird nesne motoru bu boyuttan büyüklerde çok yavaş
+IMPORT_MODULES = ('game', 'neural_network', 'vector_game', 'vector_env', 'parallel', 'train')
+
+def _best_time(function, repeats):
+    """function'ı repeats kez çalıştır, en kısa süreyi döndür"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _peak_memory(function):
+    """function çalışırken ayrılan en yüksek bellek (bayt, tracemalloc ile)"""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def _population(size):
+    """Sabit tohumlu rastgele popülasyon"""
+    np.random.seed(GENOME_SEED)
+    return EvolutionaryAlgorithm(population_size=size, input_size=LAYER_SIZES[0],
+                                 hidden_size=LAYER_SIZES[1], output_size=LAYER_SIZES[2])
+
+def _result(value, unit, better):
+    return {'value': value, 'unit': unit, 'better': better}
+
+def bench_vector_engine(size, max_steps, repeats):
+    """VectorFlappyBird ile bir neslin simülasyonu: kare/s, kuş-kare/s ve bellek"""
+    network = _population(size).population_network()
+    game = VectorFlappyBird()
+
+    # Yapılan iş (kare ve yaşayan kuş-kare sayısı) tohumlar sabit olduğu için hep aynıdır
+    game.reset(network, seed=COURSE_SEED)
+    frames = bird_frames = 0
+    while frames < max_steps and not game.game_over:
+        bird_frames += len(game.live_idx)
+        game.step()
+        frames += 1
+
+    def run():
+        game.reset(network, seed=COURSE_SEED)
+        game.run(max_steps)
+
+    seconds = _best_time(run, repeats)
+    return {
+        f'engine.vector.pop{size}.frames_per_sec': _result(frames / seconds, 'frames/s', 'higher'),
+        f'engine.vector.pop{size}.bird_frames_per_sec': _result(bird_frames / seconds, 'bird-frames/s', 'higher'),
+        f'engine.vector.pop{size}.peak_memory': _result(_peak_memory(run), 'bytes', 'lower'),
+    }
+
+def bench_jit_engine(size, max_steps, repeats):
+    """JitFlappyBird ile aynı neslin simülasyonu: kare/s (derleme süresi hariç)"""
+    network = _population(size).population_network()
+    game = jit_engine.JitFlappyBird()
+
+    def run():
+        game.reset(network, seed=COURSE_SEED)
+        game.run(max_steps)
+
+    run()  # Derleme
+    seconds = _best_time(run, repeats)
+    return {f'engine.jit.pop{size}.frames_per_sec': _result(game.frame_count / seconds, 'frames/s', 'higher')}
+
+def bench_reference_engine(size, max_steps, repeats):
+    """FlappyBird (GameMode.HEADLESS) ile aynı neslin simülasyonu: kare/s"""
+    population = _population(size).population
+    game = FlappyBird(mode=GameMode.HEADLESS)
+    frames = []
+
+    def run():
+        birds = [Bird(100, 300, brain=brain) for brain in population]
+        game.reset(birds=birds, seed=COURSE_SEED)
+        for frame in range(max_steps):
+            if game.step()[2]:
+                break
+        frames.append(frame + 1)
+
+    seconds = _best_time(run, repeats)
+    return {f'engine.reference.pop{size}.frames_per_sec': _result(frames[0] / seconds, 'frames/s', 'higher')}
+
+def bench_vector_env(num_envs, steps, repeats):
+    """FlappyVectorEnv ile sabit rastgele eylemler: ortam-adım/s (otomatik sıfırlamalar dahil)"""
+    env = FlappyVectorEnv(num_envs)
+    actions = np.random.RandomState(GENOME_SEED).rand(steps, num_envs) < 0.07
+
+    def run():
+        env.reset(COURSE_SEED)
+        for frame in range(steps):
+            env.step(actions[frame])
+
+    seconds = _best_time(run, repeats)
+    return {f'env.vector.envs{num_envs}.steps_per_sec': _result(num_envs * steps / seconds, 'env-steps/s', 'higher')}
+
+def bench_predict(calls, batch, repeats):
+    """Tek ağ tahmini ve toplu popülasyon tahmini"""
+    evolution = _population(batch)
+    network = evolution.population[0]
+    single_input = np.random.RandomState(GENOME_SEED).randn(LAYER_SIZES[0])
+    batch_input = np.random.RandomState(GENOME_SEED).randn(batch, LAYER_SIZES[0])
+    population = evolution.population_network()
+
+    def single():
+        for _ in range(calls):
+            network.predict(single_input)
+
+    def batched():
+        for _ in range(calls // 10):
+            population.predict(batch_input)
+
+    return {
+        'predict.single.calls_per_sec': _result(calls / _best_time(single, repeats), 'calls/s', 'higher'),
+        f'predict.population.pop{batch}.rows_per_sec':
+            _result(batch * (calls // 10) / _best_time(batched, repeats), 'rows/s', 'higher'),
+    }
+
+def bench_mutate(calls, size, repeats):
+    """Tek ağ mutasyonu ve tüm popülasyonun varyasyonu (çaprazlama + mutasyon)"""
+    evolution = _population(size)
+    evolution.crossover_rate = 0.5
+    network = evolution.population[0].copy()
+    parents = evolution.genomes[:evolution.survivors_count()]
+
+    def single():
+        for _ in range(calls):
+            network.mutate(0.2, 0.3)
+
+    return {
+        'mutate.single.calls_per_sec': _result(calls / _best_time(single, repeats), 'calls/s', 'higher'),
+        f'evolution.vary.pop{size}.seconds':
+            _result(_best_time(lambda: evolution.vary(parents, size), repeats), 's', 'lower'),
+    }
+
+def bench_generation(size, max_steps, generations):
+    """train_headless ile aynı adımlardan oluşan tam nesiller: nesil başına süre ve bellek"""
+    evolution = _population(size)
+    game = VectorFlappyBird()
+
+    def run():
+        for generation in range(generations):
+            game.reset(evolution.population_network(), seed=COURSE_SEED + generation)
+            game.run(max_steps)
+            evolution.create_next_generation_from_results(game.results())
+
+    seconds = _best_time(run, 1)
+    return {
+        f'generation.pop{size}.seconds': _result(seconds / generations, 's', 'lower'),
+        f'generation.pop{size}.peak_memory': _result(_peak_memory(run), 'bytes', 'lower'),
+    }
+
+def bench_imports(repeats):
+    """Her modülün yeni bir yorumlayıcıda soğuk içe aktarma süresi"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for module in IMPORT_MODULES:
+        code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+        samples = [float(subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True,
+                                        text=True, check=True).stdout.strip().splitlines()[-1])
+                   for _ in range(repeats)]
+        results[f'import.{module}.seconds'] = _result(min(samples), 's', 'lower')
+    return results
+
+def run_benchmarks(quick=False, repeats=3, max_steps=1000):
+    """Tüm kıyaslamaları çalıştır ve {ad: {'value', 'unit', 'better'}} sözlüğü döndür"""
+    sizes = QUICK_POPULATION_SIZES if quick else POPULATION_SIZES
+    results = {}
+    for size in sizes:
+        results.update(bench_vector_engine(size, max_steps, repeats))
+        if jit_engine.available():
+            results.update(bench_jit_engine(size, max_steps, repeats))
+        if size <= REFERENCE_MAX_POPULATION:
+            results.update(bench_reference_engine(size, max_steps, 1 if size > 100 else repeats))
+    results.update(bench_vector_env(1024, 200 if quick else 1000, repeats))
+    results.update(bench_predict(2000 if quick else 20000, 1000, repeats))
+    results.update(bench_mutate(2000 if quick else 20000, 1000, repeats))
+    results.update(bench_generation(1000, max_steps, 3 if quick else 10))
+    results.update(bench_imports(repeats))
+    return results
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def compare(results, baseline, threshold):
+    """Taban çizgisine göre değişimleri döndür: [(ad, taban, şimdi, değişim, kötüleşme mi)]
+
+    değişim > 0 her zaman iyileşme anlamına gelir (süre/bellekte azalma, hızda artış).
+    """
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]['value'], result['value']
+        if old == 0:
+            continue
+        change = (new - old) / old if result['better'] == 'higher' else (old - new) / old
+        rows.append((name, old, new, change, change < -threshold))
+    return rows
+
+def _load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+def _write_results(path, results, quick):
+    ensure_dir(os.path.dirname(path))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'machine': machine_info(), 'quick': quick, 'results': results}, f, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Flappy Bird AI kıyaslamaları')
+    parser.add_argument('--quick', action='store_true',
+                        help='Küçük popülasyonlar ve daha az tekrar ile hızlı çalıştır')
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='Her ölçümün tekrar sayısı (en iyi süre kullanılır)')
+    parser.add_argument('--max_steps', type=int, default=1000,
+                        help='Simülasyon kıyaslamalarında nesil başına maksimum kare')
+    parser.add_argument('--output', type=str, default=os.path.join('bench', 'results.json'),
+                        help='Sonuçların yazılacağı JSON dosyası')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='Karşılaştırılacak taban çizgisi JSON dosyası')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Kötüleşme eşiği (oran, varsayılan %%10)')
+    parser.add_argument('--save_baseline', type=str, default=None,
+                        help='Sonuçları ayrıca taban çizgisi olarak bu dosyaya yaz')
+
+    args = parser.parse_args()
+
+    results = run_benchmarks(quick=args.quick, repeats=args.repeats, max_steps=args.max_steps)
+    _write_results(args.output, results, args.quick)
+    if args.save_baseline:
+        _write_results(args.save_baseline, results, args.quick)
+
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        print(f"{name:<{width}}  {result['value']:>16.6g} {result['unit']}")
+    print(f"Sonuçlar yazıldı: {args.output}")
+
+    if args.baseline:
+        regressions = 0
+        print(f"\nTaban çizgisi ile karşılaştırma ({args.baseline}, eşik %{100 * args.threshold:.0f}):")
+        for name, old, new, change, regressed in compare(results, _load_results(args.baseline), args.threshold):
+            marker = 'KÖTÜLEŞME' if regressed else ''
+            print(f"{name:<{width}}  {old:>14.6g} -> {new:>14.6g}  {100 * change:+7.1f}%  {marker}")
+            regressions += regressed
+        if regressions:
+            print(f"{regressions} ölçümde eşiği aşan kötüleşme var")
+            sys.exit(1)
+        print("Eşiği aşan kötüleşme yok")
@@ -0,0 +1,45 @@
+"""Eğitimin kaldığı yerden devam ettirilebilmesi için kontrol noktaları.
+
+Kontrol noktası, EvolutionaryAlgorithm'in tam durumunu (genom matrisi, en iyi
+model, uygunluk geçmişleri, nesil sayacı, numpy rastgele üreteç durumu) ve
+eğitim döngüsünün ek durumunu tek bir .npz dosyasında tutar. Dosya önce geçici
+bir dosyaya yazılıp os.replace ile yerine taşınır; yazma sırasında süreç ölse
+bile diskte her zaman eksiksiz bir kontrol noktası kalır.
+"""
+import os
+import numpy as np
+from artifacts import ArtifactWriter, ensure_dir
+
+CHECKPOINT_FILE = 'checkpoint.npz'
+
+def save_checkpoint(path, state):
+    """Durum sözlüğünü (isim -> dizi/sayı) atomik olarak path'e yaz"""
+    ensure_dir(os.path.dirname(path))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **state)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+def load_checkpoint(path):
+    """Kontrol noktasını yükle: isim -> numpy dizisi sözlüğü"""
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+class CheckpointWriter(ArtifactWriter):
+    """Kontrol noktalarını arka plandaki bir iş parçacığında diske yazar.
+
+    submit() sadece durumu kuyruğa koyar; yazma eğitim döngüsünü bekletmez.
+    Yazıcı geride kalırsa bekleyen eski kontrol noktası atılır ve en yenisi
+    yazılır. close() bekleyen son kontrol noktası yazılana kadar bekler.
+    """
+    def __init__(self, path):
+        super().__init__(max_pending=1, replace_pending=True)
+        self.path = path
+
+    def submit(self, state):
+        """Durumu yazılmak üzere kuyruğa ekle (bekleyen eski durumun yerine geçer)"""
+        super().submit(save_checkpoint, self.path, state)
@@ -0,0 +1,360 @@
+"""Soket üzerinden çok makineli nesil değerlendirmesi.
+
+Koordinatör (DistributedEvaluator) bir TCP veya Unix soketi dinler; işçiler
+(run_worker, train.py --mode evaluate) bağlanır ve kendilerine gönderilen
+genom yığınlarını headless motorda simüle edip kuş başına sonuçları geri
+gönderir. ParallelEvaluator ile aynı arayüze sahiptir (evaluate / close) ve
+sonuçları aynı (parkur, kuş) sırasında birleştirir, bu yüzden eğitim
+sonuçları tek süreçli eğitimle aynıdır.
+
+Protokol: her mesaj 1 baytlık tür ve 8 baytlık uzunluk başlığıyla başlar.
+Genomlar ve sonuçlar pickle yerine ham küçük-endian dizi baytları olarak
+taşınır.
+
+    HELLO      işçi -> koordinatör  işçi adı (UTF-8)
+    HEARTBEAT  işçi -> koordinatör  boş; işçi meşgulken de düzenli gönderilir
+    TASK       koordinatör -> işçi  iş no, katman boyutları, tohumlar, genomlar
+    RESULT     işçi -> koordinatör  iş no, skor / hayatta / y / hız dizileri
+    SHUTDOWN   koordinatör -> işçi  boş
+
+Bağlantısı kopan veya heartbeat_timeout saniye boyunca sinyal göndermeyen
+işçinin elindeki iş kuyruğa geri konur ve başka bir işçiye verilir.
+
+Adresler: tcp://host:port (port 0: boş bir port seçilir) veya unix:///yol.
+"""
+import collections
+import multiprocessing as mp
+import os
+import selectors
+import socket
+import struct
+import threading
+import time
+import numpy as np
+from neural_network import PopulationNetwork
+from jit_engine import create_engine
+from parallel import merge_shards
+
+HELLO, HEARTBEAT, TASK, RESULT, SHUTDOWN = 1, 2, 3, 4, 5
+
+_FRAME = struct.Struct('<BQ')       # tür, yük uzunluğu
+_TASK = struct.Struct('<QIHHHIBH')  # iş no, satır, girdi, gizli, çıktı, maks. adım, bayraklar, tohum sayısı
+_RESULT = struct.Struct('<QIIQ')    # iş no, satır, parkur sayısı, kare sayısı
+_MULTI_COURSE = 1                   # Bayrak: tohumlar bir parkur listesi
+_FAST = 2                           # Bayrak: olay odaklı ilerletme
+
+def parse_address(address):
+    """'tcp://host:port' veya 'unix:///yol' adresini (aile, soket adresi) olarak çöz"""
+    if address.startswith('unix://'):
+        return socket.AF_UNIX, address[len('unix://'):]
+    if address.startswith('tcp://'):
+        host, _, port = address[len('tcp://'):].rpartition(':')
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    raise ValueError(f'Geçersiz adres: {address} (tcp://host:port veya unix:///yol)')
+
+def format_address(family, sockaddr):
+    if family == socket.AF_UNIX:
+        return f'unix://{sockaddr}'
+    return f'tcp://{sockaddr[0]}:{sockaddr[1]}'
+
+def _send(sock, kind, payload=b''):
+    sock.sendall(_FRAME.pack(kind, len(payload)))
+    if payload:
+        sock.sendall(payload)
+
+def _recv_exact(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError('Bağlantı kapandı')
+        received += count
+    return buffer
+
+def encode_task(task_id, genomes, layer_sizes, seed, max_steps, fast=False):
+    """Genom yığınını TASK yüküne çevir (genomlar ham float64 baytları)"""
+    if seed is None:
+        raise ValueError('Dağıtık değerlendirme tohumlu parkur gerektirir')
+    seeds = list(seed) if isinstance(seed, (list, tuple)) else [seed]
+    flags = (_MULTI_COURSE if isinstance(seed, (list, tuple)) else 0) | (_FAST if fast else 0)
+    header = _TASK.pack(task_id, len(genomes), *layer_sizes, max_steps, flags, len(seeds))
+    return (header + np.asarray(seeds, dtype='<u8').tobytes()
+            + np.ascontiguousarray(genomes, dtype='<f8').tobytes())
+
+def decode_task(payload):
+    """TASK yükünü (iş no, genomlar, katman boyutları, tohum, maks. adım, fast) olarak çöz"""
+    task_id, rows, input_size, hidden_size, output_size, max_steps, flags, n_seeds = \
+        _TASK.unpack_from(payload)
+    offset = _TASK.size
+    seeds = np.frombuffer(payload, dtype='<u8', count=n_seeds, offset=offset).tolist()
+    offset += 8 * n_seeds
+    genomes = np.frombuffer(payload, dtype='<f8', offset=offset).reshape(rows, -1)
+    seed = seeds if flags & _MULTI_COURSE else seeds[0]
+    return (task_id, genomes, (input_size, hidden_size, output_size), seed, max_steps,
+            bool(flags & _FAST))
+
+def encode_result(task_id, results):
+    """Motor sonuçlarını (results()) RESULT yüküne çevir"""
+    rows = len(results['scores']) // results['courses']
+    return b''.join([
+        _RESULT.pack(task_id, rows, results['courses'], int(results['frames'])),
+        np.asarray(results['scores'], dtype='<i8').tobytes(),
+        np.asarray(results['alive'], dtype='u1').tobytes(),
+        np.asarray(results['y'], dtype='<f8').tobytes(),
+        np.asarray(results['velocity'], dtype='<f8').tobytes(),
+    ])
+
+def decode_result(payload):
+    """RESULT yükünü (iş no, sonuç sözlüğü) olarak çöz"""
+    task_id, rows, courses, frames = _RESULT.unpack_from(payload)
+    count = rows * courses
+    offset = _RESULT.size
+    arrays = {}
+    for name, dtype in (('scores', '<i8'), ('alive', 'u1'), ('y', '<f8'), ('velocity', '<f8')):
+        array = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+        offset += array.nbytes
+        arrays[name] = array
+    arrays['scores'] = arrays['scores'].astype(np.int64)
+    arrays['alive'] = arrays['alive'].astype(bool)
+    arrays['frames'] = frames
+    arrays['courses'] = courses
+    return task_id, arrays
+
+def run_worker(address, engine='numpy', heartbeat_interval=1.0, connect_timeout=30.0, name=None):
+    """Koordinatöre bağlan ve SHUTDOWN gelene veya bağlantı kapanana kadar iş değerlendir
+
+    Koordinatör henüz dinlemiyorsa connect_timeout saniye boyunca yeniden
+    denenir. Simülasyon sürerken ayrı bir iş parçacığı heartbeat gönderir.
+    """
+    family, sockaddr = parse_address(address)
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.connect(sockaddr)
+            break
+        except OSError:
+            sock.close()
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+    if family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    send_lock = threading.Lock()
+    stopped = threading.Event()
+
+    def send(kind, payload=b''):
+        with send_lock:
+            _send(sock, kind, payload)
+
+    def heartbeat():
+        while not stopped.wait(heartbeat_interval):
+            try:
+                send(HEARTBEAT)
+            except OSError:
+                return
+
+    game = create_engine(engine)
+    send(HELLO, (name or f'{socket.gethostname()}:{os.getpid()}').encode('utf-8'))
+    threading.Thread(target=heartbeat, daemon=True).start()
+    try:
+        while True:
+            try:
+                kind, size = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+                payload = _recv_exact(sock, size) if size else b''
+            except ConnectionError:
+                return
+            if kind == SHUTDOWN:
+                return
+            if kind != TASK:
+                continue
+
+            task_id, genomes, layer_sizes, seed, max_steps, fast = decode_task(payload)
+            network = PopulationNetwork(genomes, *layer_sizes)
+            if isinstance(seed, list):
+                game.reset(network, seeds=seed)
+            else:
+                game.reset(network, seed=seed)
+            game.run(max_steps, fast=fast)
+            send(RESULT, encode_result(task_id, game.results()))
+    finally:
+        stopped.set()
+        sock.close()
+
+class _WorkerConnection:
+    """Koordinatör tarafında bir işçi bağlantısı: okuma tamponu ve elindeki iş"""
+    def __init__(self, sock, peer):
+        self.sock = sock
+        self.name = str(peer)
+        self.buffer = bytearray()
+        self.task = None  # Elindeki iş no
+        self.last_seen = time.monotonic()
+
+    def read(self):
+        """Gelen baytları tampona ekle, bağlantı kapandıysa False döndür"""
+        data = self.sock.recv(1 << 20)
+        if not data:
+            return False
+        self.buffer += data
+        self.last_seen = time.monotonic()
+        return True
+
+    def messages(self):
+        """Tampondaki tamamlanmış mesajları (tür, yük) olarak çıkar"""
+        while len(self.buffer) >= _FRAME.size:
+            kind, size = _FRAME.unpack_from(self.buffer)
+            end = _FRAME.size + size
+            if len(self.buffer) < end:
+                return
+            payload = bytes(self.buffer[_FRAME.size:end])
+            del self.buffer[:end]
+            yield kind, payload
+
+class DistributedEvaluator:
+    """Nesli soket üzerinden bağlanan işçilere yığınlar halinde dağıtır
+
+    Popülasyon batch_size satırlık işlere bölünür; her boştaki işçiye bir iş
+    verilir. Bağlantısı kopan veya heartbeat_timeout saniye sessiz kalan
+    işçinin işi yeniden kuyruğa alınır. local_workers > 0 ise aynı makinede o
+    kadar işçi süreci başlatılır (tek makinede deneme için). Hiç işçi yokken
+    worker_wait saniye beklenir, sonra RuntimeError verilir.
+    """
+    def __init__(self, address, batch_size=256, local_workers=0, engine='numpy', fast=False,
+                 heartbeat_timeout=10.0, worker_wait=300.0):
+        self.batch_size = batch_size
+        self.fast = fast
+        self.heartbeat_timeout = heartbeat_timeout
+        self.worker_wait = worker_wait
+        self.next_task_id = 0
+
+        family, sockaddr = parse_address(address)
+        if family == socket.AF_UNIX and os.path.exists(sockaddr):
+            os.unlink(sockaddr)
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(sockaddr)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.family = family
+        self.address = format_address(family, self.listener.getsockname())
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.connections = {}  # soket -> _WorkerConnection
+
+        self.local_workers = [mp.Process(target=run_worker, args=(self.address, engine), daemon=True)
+                              for _ in range(local_workers)]
+        for process in self.local_workers:
+            process.start()
+
+    def _accept(self):
+        sock, peer = self.listener.accept()
+        sock.setblocking(True)
+        if self.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connections[sock] = _WorkerConnection(sock, peer)
+        self.selector.register(sock, selectors.EVENT_READ)
+
+    def _drop(self, connection, pending, reason):
+        """İşçiyi çıkar; elinde iş varsa kuyruğun başına geri koy"""
+        if connection.task is not None:
+            pending.appendleft(connection.task)
+            print(f"İşçi {connection.name} {reason}, işi yeniden dağıtılıyor")
+        self.selector.unregister(connection.sock)
+        connection.sock.close()
+        del self.connections[connection.sock]
+
+    def evaluate(self, network, seed, max_steps):
+        """PopulationNetwork'ü işçilerde değerlendir, birleştirilmiş sonuçları döndür"""
+        layer_sizes = (network.input_size, network.hidden_size, network.output_size)
+        bounds = list(range(0, len(network), self.batch_size)) + [len(network)]
+        tasks = {}
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            tasks[self.next_task_id] = (start, stop)
+            self.next_task_id += 1
+        order = list(tasks)
+        pending = collections.deque(order)
+        done = {}
+
+        # İki nesil arasında okunmamış heartbeat'ler işçiyi ölü göstermesin
+        now = time.monotonic()
+        for connection in self.connections.values():
+            connection.last_seen = now
+        waiting_since = None
+
+        while len(done) < len(tasks):
+            # Boştaki işçilere iş ver
+            for connection in list(self.connections.values()):
+                if connection.task is None and pending:
+                    task_id = pending.popleft()
+                    start, stop = tasks[task_id]
+                    try:
+                        _send(connection.sock, TASK, encode_task(task_id, network.genomes[start:stop],
+                                                                 layer_sizes, seed, max_steps, self.fast))
+                    except OSError:
+                        pending.appendleft(task_id)
+                        self._drop(connection, pending, 'bağlantısı koptu')
+                        continue
+                    connection.task = task_id
+
+            # İşçi yoksa bekle (belirli bir süreden sonra vazgeç)
+            if not self.connections:
+                waiting_since = waiting_since or time.monotonic()
+                if time.monotonic() - waiting_since > self.worker_wait:
+                    raise RuntimeError(f'{self.worker_wait:.0f} saniyedir bağlı işçi yok ({self.address})')
+            else:
+                waiting_since = None
+
+            for key, _ in self.selector.select(timeout=min(1.0, self.heartbeat_timeout)):
+                if key.fileobj is self.listener:
+                    self._accept()
+                    continue
+                connection = self.connections[key.fileobj]
+                try:
+                    alive = connection.read()
+                except OSError:
+                    alive = False
+                if not alive:
+                    self._drop(connection, pending, 'bağlantısı koptu')
+                    continue
+                for kind, payload in connection.messages():
+                    if kind == HELLO:
+                        connection.name = payload.decode('utf-8')
+                    elif kind == RESULT:
+                        task_id, results = decode_result(payload)
+                        if task_id == connection.task:
+                            done[task_id] = results
+                            connection.task = None
+
+            # Sessiz kalan işçiler
+            now = time.monotonic()
+            for connection in list(self.connections.values()):
+                if now - connection.last_seen > self.heartbeat_timeout:
+                    self._drop(connection, pending, 'yanıt vermiyor')
+
+        return merge_shards([done[task_id] for task_id in order])
+
+    def close(self):
+        """İşçilere SHUTDOWN gönder, soketleri kapat, yerel işçileri bekle"""
+        for connection in list(self.connections.values()):
+            try:
+                _send(connection.sock, SHUTDOWN)
+            except OSError:
+                pass
+            self.selector.unregister(connection.sock)
+            connection.sock.close()
+        self.connections.clear()
+        self.selector.close()
+        self.listener.close()
+        if self.family == socket.AF_UNIX:
+            path = parse_address(self.address)[1]
+            if os.path.exists(path):
+                os.unlink(path)
+        for process in self.local_workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,103 @@
+"""Genom + parkur anahtarlı, LRU sınırlı değerlendirme önbelleği.
+
+Parkur tohumla belirlendiği ve kuşlar birbirinden bağımsız hareket ettiği için
+aynı genom aynı parkurda (aynı maksimum adım sayısıyla) her zaman aynı sonucu
+verir. Önbellek, genom baytlarının özetini ve değerlendirme bağlamını
+(parkur tohumu, maksimum adım) anahtar olarak kullanır; sonucu bilinen kuşlar
+ve aynı nesildeki özdeş genomlar yeniden simüle edilmez.
+
+Erken bitirme (early_stop) sonuçları değiştirmez: sıralama kesinleştiğinde
+kalan kuş sonuna kadar simüle edilir, bu yüzden önbellek onunla birlikte de
+kullanılabilir.
+"""
+import collections
+import hashlib
+import numpy as np
+
+# Önbellekte kuş başına tutulan sonuç dizileri
+RESULT_KEYS = ('scores', 'alive', 'y', 'velocity')
+
+class EvaluationCache:
+    """Kuş başına simülasyon sonuçlarını en fazla max_entries kayıt tutan LRU önbellek"""
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()  # anahtar -> (skor, hayatta, y, hız)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def key(genome, context):
+        """Genom baytları ve bağlam (ör. (parkur tohumu, maksimum adım)) için anahtar"""
+        digest = hashlib.blake2b(np.ascontiguousarray(genome).tobytes(), digest_size=16)
+        digest.update(repr(context).encode('utf-8'))
+        return digest.digest()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, network, context, evaluate, courses=1):
+        """PopulationNetwork'ü önbellek üzerinden değerlendir
+
+        Sadece önbellekte olmayan ve nesil içinde ilk kez görülen genomlar
+        evaluate(alt ağ) ile simüle edilir (evaluate bir results() sözlüğü
+        döndürmelidir). Dönen sözlük tüm popülasyonun sonuçlarını içerir;
+        'frames' gerçekten simüle edilen kare sayısıdır. courses > 1 ise
+        sonuçlar VectorFlappyBird'deki gibi (parkur, kuş) sırasındadır ve her
+        kayıt genomun tüm parkurlardaki sonuçlarını tutar.
+        """
+        n = len(network)
+        keys = [self.key(genome, context) for genome in network.genomes]
+
+        merged = {
+            'scores': np.zeros((courses, n), dtype=np.int64),
+            'alive': np.zeros((courses, n), dtype=bool),
+            'y': np.zeros((courses, n)),
+            'velocity': np.zeros((courses, n)),
+        }
+        frames = 0
+
+        # Önbellekte olanları doldur, olmayanların ilk örneklerini topla
+        first_seen = {}  # anahtar -> simüle edilecek alt ağdaki satır
+        todo = []
+        source = np.full(n, -1)
+        for i, key in enumerate(keys):
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                for name, value in zip(RESULT_KEYS, entry):
+                    merged[name][:, i] = value
+                self.hits += 1
+            elif key in first_seen:
+                source[i] = first_seen[key]
+                self.hits += 1
+            else:
+                first_seen[key] = len(todo)
+                source[i] = len(todo)
+                todo.append(i)
+                self.misses += 1
+
+        if todo:
+            results = evaluate(network.take(np.array(todo)))
+            simulated = {name: results[name].reshape(courses, -1) for name in RESULT_KEYS}
+            rows = source >= 0
+            for name in RESULT_KEYS:
+                merged[name][:, rows] = simulated[name][:, source[rows]]
+            frames = results['frames']
+
+            for row, i in enumerate(todo):
+                self.entries[keys[i]] = tuple(simulated[name][:, row].copy() for name in RESULT_KEYS)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+        merged = {name: values.ravel() for name, values in merged.items()}
+        merged['frames'] = frames
+        merged['courses'] = courses
+        return merged
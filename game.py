@@ -1,8 +1,32 @@
-import pygame
 import random
 import os
 import numpy as np
 from enum import Enum
+from profiling import hook
+
+# pygame sadece görsel modlarda (HUMAN/AI) yüklenir; headless simülasyon ve
+# işçi süreçler SDL başlatma maliyetini ödemez
+pygame = None
+
+def _load_pygame():
+    global pygame
+    if pygame is None:
+        import pygame as _pygame
+        pygame = _pygame
+    return pygame
+
+# Oyun fiziği sabitleri (Bird, Pipe ve vektörleştirilmiş motor ortak kullanır)
+GRAVITY = 0.8
+JUMP_STRENGTH = -10
+BIRD_WIDTH = 34
+BIRD_HEIGHT = 24
+BIRD_MAX_Y = 400  # Kuş bu yüksekliğe ulaştığında ölür
+PIPE_WIDTH = 60
+PIPE_SPEED = 3
+PIPE_GAP_HEIGHT = 170
+PIPE_GAP_MIN = 180
+PIPE_GAP_MAX = 320
+PIPE_SPAWN_INTERVAL = 60  # Kaç karede bir yeni boru eklenir
 
 class GameMode(Enum):
     HUMAN = 1   # İnsan oyuncular için mod
@@ -14,14 +38,17 @@ class Bird:
         self.x = x
         self.y = y
         self.velocity = 0
-        self.gravity = 0.8
-        self.jump_strength = -10
-        self.width = 34
-        self.height = 24
+        self.gravity = GRAVITY
+        self.jump_strength = JUMP_STRENGTH
+        self.width = BIRD_WIDTH
+        self.height = BIRD_HEIGHT
         self.alive = True
         self.score = 0
         self.fitness = 0
         self.brain = brain
+        # Çoklu parkur değerlendirmesinde parkur başına skorlar ve hayatta olma
+        self.course_scores = None
+        self.course_alive = None
         # Kuşlar için rastgele renk (görsel ayırt etme için)
         self.color = (
             random.randint(100, 255),  # R
@@ -33,24 +60,13 @@ class Bird:
         # Kuşu zıplat (negatif hız uygula)
         self.velocity = self.jump_strength
     
-    def apply_brain(self, pipes):
+    @hook('game.apply_brain')
+    def apply_brain(self, next_pipe, second_pipe=None):
         # Eğer beyin yoksa veya boru yoksa işlem yapma
-        if self.brain is None or not pipes:
+        # (sonraki iki boru PipeRing imlecinden gelir: next_pipe() ve second_pipe())
+        if self.brain is None or next_pipe is None:
             return
         
-        # Bir sonraki boruyu bul
-        next_pipe = None
-        second_pipe = None
-        
-        # Sonraki iki boruyu bul
-        for pipe in pipes:
-            if pipe.x + pipe.width > self.x:
-                if next_pipe is None:
-                    next_pipe = pipe
-                elif second_pipe is None:
-                    second_pipe = pipe
-                    break
-        
         if next_pipe:
             # Daha gelişmiş girdileri hesapla
             # Bir sonraki boruya olan mesafeyi normalize et (yatay)
@@ -98,6 +114,7 @@ class Bird:
             if self.brain.predict(inputs) > 0.5:  # Tüm girdileri kullan
                 self.jump()
     
+    @hook('game.physics')
     def update(self):
         # Yerçekimi etkisi ve konum güncelleme
         self.velocity += self.gravity
@@ -108,8 +125,9 @@ class Bird:
             self.y = 0
             self.velocity = 0
         
-        return self.y < 400  # Ekran sınırları içinde olup olmadığını döndür
+        return self.y < BIRD_MAX_Y  # Ekran sınırları içinde olup olmadığını döndür
     
+    @hook('game.collision')
     def collides_with(self, pipe):
         # Üst boru ile çarpışma kontrolü
         if (self.x + self.width > pipe.x and self.x < pipe.x + pipe.width and 
@@ -123,37 +141,159 @@ class Bird:
         
         return False
 
+class PipeCourse:
+    """Boru boşluk konumlarının (gap_y) tekrarlanabilir dizisi
+    
+    Borular kendi rastgele sayı akışından üretilir, böylece kuş oluşturma gibi
+    global random modülünü kullanan işlemler parkuru değiştirmez. Aynı tohum veya
+    aynı gaps listesi her zaman aynı parkuru verir. gaps listesi biterse kalan
+    borular tohumlu akıştan üretilir.
+    """
+    def __init__(self, seed=None, gaps=None):
+        self.seed = seed
+        self.gaps = list(gaps) if gaps is not None else []
+        self.reset()
+    
+    def reset(self):
+        # Parkuru baştan başlat
+        self.rng = random.Random(self.seed)
+        self.index = 0
+    
+    def next_gap(self):
+        if self.index < len(self.gaps):
+            gap_y = self.gaps[self.index]
+        else:
+            gap_y = self.rng.randint(PIPE_GAP_MIN, PIPE_GAP_MAX)
+        self.index += 1
+        return gap_y
+
 class Pipe:
-    def __init__(self, x):
+    def __init__(self, x, gap_y=None):
         self.x = x
-        self.width = 60
-        self.speed = 3  # Daha yavaş - kuşların tepki vermesi için daha fazla zaman
-        self.gap_height = 170  # Daha geniş boşluk - başlangıçta geçmeyi kolaylaştırır
-        self.gap_y = random.randint(180, 320)  # Daha dar yükseklik aralığı - uç pozisyonları azaltır
-        self.passed = False
+        self.width = PIPE_WIDTH
+        self.speed = PIPE_SPEED  # Daha yavaş - kuşların tepki vermesi için daha fazla zaman
+        self.gap_height = PIPE_GAP_HEIGHT  # Daha geniş boşluk - başlangıçta geçmeyi kolaylaştırır
+        # Daha dar yükseklik aralığı - uç pozisyonları azaltır
+        self.gap_y = gap_y if gap_y is not None else random.randint(PIPE_GAP_MIN, PIPE_GAP_MAX)
+        self.passed = False  # Kuş sütunu boruyu geçti mi (PipeRing tarafından işaretlenir)
     
     def update(self):
         # Boruyu sola doğru hareket ettir
         self.x -= self.speed
         return self.x > -self.width  # Boru hala ekranda mı?
+
+class PipeRing:
+    """Ekrandaki boruların sabit kapasiteli halka tamponu ve kuş sütunu imleci
     
-    def is_passed_by(self, bird):
-        # Kuş boruyu geçti mi kontrol et
-        if not self.passed and bird.x > self.x + self.width:
-            self.passed = True
-            return True
-        return False
+    Borular eklenme sırasıyla (soldan sağa) tutulur ve hepsi aynı hızla
+    hareket eder; bu yüzden ekrandan çıkan borular her zaman baştan silinir ve
+    kuş sütununu (column_x) geçmiş borular her zaman baştaki bir öneki
+    oluşturur. İki imleç bu öneki izler: passed, geçilmiş boru sayısı; next,
+    önündeki ilk borunun sırası (x + genişlik > column_x). İmleçler sadece
+    ileri gider, bu yüzden her karede iş sabit zamanlıdır ve yeni liste
+    oluşturulmaz. Pipe nesneleri yuvalarda tekrar kullanılır.
+    """
+    def __init__(self, capacity):
+        self.slots = [Pipe(0, gap_y=0) for _ in range(capacity)]
+        self.column_x = 0
+        self.clear()
+    
+    def clear(self, column_x=None):
+        # Tamponu boşalt (column_x verilirse imleçlerin izlediği kuş sütunu değişir)
+        if column_x is not None:
+            self.column_x = column_x
+        self.head = 0    # En eski (en soldaki) borunun yuvası
+        self.count = 0   # Ekrandaki boru sayısı
+        self.passed = 0  # Baştan itibaren kuş sütununun geçtiği boru sayısı
+        self.next = 0    # Kuş sütununun önündeki ilk borunun sırası
+    
+    def __len__(self):
+        return self.count
+    
+    def __getitem__(self, i):
+        # i. boru (0: en soldaki)
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return self.slots[(self.head + i) % len(self.slots)]
+    
+    def __iter__(self):
+        capacity = len(self.slots)
+        for i in range(self.count):
+            yield self.slots[(self.head + i) % capacity]
+    
+    def add(self, x, gap_y):
+        # Sağa yeni boru ekle (kapasite dolarsa tampon büyütülür)
+        if self.count == len(self.slots):
+            self.slots = list(self) + [Pipe(0, gap_y=0) for _ in range(len(self.slots))]
+            self.head = 0
+        pipe = self.slots[(self.head + self.count) % len(self.slots)]
+        pipe.x = x
+        pipe.gap_y = gap_y
+        pipe.passed = False
+        self.count += 1
+        return pipe
+    
+    def advance(self):
+        """Boruları hareket ettir, ekrandan çıkanları sil, yeni geçilen boru sayısını döndür"""
+        capacity = len(self.slots)
+        for i in range(self.count):
+            self.slots[(self.head + i) % capacity].update()
+        
+        # Ekrandan çıkan borular (hepsi baştadır)
+        while self.count and self.slots[self.head].x <= -PIPE_WIDTH:
+            self.head = (self.head + 1) % capacity
+            self.count -= 1
+            self.passed = max(0, self.passed - 1)
+            self.next = max(0, self.next - 1)
+        
+        # Kuş sütununun bu karede geçtiği borular
+        newly_passed = 0
+        while self.passed < self.count:
+            pipe = self.slots[(self.head + self.passed) % capacity]
+            if not self.column_x > pipe.x + pipe.width:
+                break
+            pipe.passed = True
+            self.passed += 1
+            newly_passed += 1
+        
+        # Önündeki ilk boru
+        while self.next < self.count:
+            pipe = self.slots[(self.head + self.next) % capacity]
+            if pipe.x + pipe.width > self.column_x:
+                break
+            self.next += 1
+        return newly_passed
+    
+    def next_pipe(self):
+        # Kuş sütununun önündeki ilk boru (yoksa None)
+        if self.next < self.count:
+            return self.slots[(self.head + self.next) % len(self.slots)]
+        return None
+    
+    def second_pipe(self):
+        # Kuş sütununun önündeki ikinci boru (yoksa None)
+        if self.next + 1 < self.count:
+            return self.slots[(self.head + self.next + 1) % len(self.slots)]
+        return None
 
 class FlappyBird:
-    def __init__(self, mode=GameMode.HUMAN, width=800, height=600, fps=60):
+    def __init__(self, mode=GameMode.HUMAN, width=800, height=600, fps=60, seed=None, gaps=None):
+        # seed veya gaps verilirse her reset aynı boru parkurunu üretir
+        self.course = PipeCourse(seed, gaps)
         self.width = width
         self.height = height
         self.ground_y = height - 100
         self.fps = fps
         self.mode = mode
         
+        # Pipe ring buffer sized for the pipes visible at once
+        # (screen width + pipe width over the distance between spawns)
+        spacing = PIPE_SPEED * PIPE_SPAWN_INTERVAL
+        self.pipes = PipeRing(-(-(width + PIPE_WIDTH) // spacing) + 1)
+        
         # Initialize Pygame if not in headless mode
         if mode != GameMode.HEADLESS:
+            _load_pygame()
             pygame.init()
             self.screen = pygame.display.set_mode((width, height))
             pygame.display.set_caption("Flappy Bird AI")
@@ -166,10 +306,25 @@ class FlappyBird:
             self.pipe_img.fill((0, 255, 0))  # Green pipe
             self.bg_color = (135, 206, 235)  # Sky blue
             self.font = pygame.font.SysFont(None, 36)
+            
+            # Render caches: pipe surfaces per height, bird number labels (the
+            # bird color is filled when drawing), text glyphs per (char, color)
+            self.pipe_surfaces = {}
+            self.bird_labels = {}
+            self.glyphs = {}
+            # Screen areas drawn in the last rendered frame (sent to the display again
+            # next frame so they get cleared)
+            self.dirty_rects = []
+            self.full_redraw = True
         
         self.reset()
     
-    def reset(self, birds=None):
+    def reset(self, birds=None, seed=None):
+        # Pipe course (a new seed replaces the current course)
+        if seed is not None:
+            self.course = PipeCourse(seed)
+        self.course.reset()
+        
         # Game state
         self.game_over = False
         self.score = 0
@@ -182,17 +337,24 @@ class FlappyBird:
             # Initialize one bird at the center of the screen
             self.birds = [Bird(self.width // 4, self.height // 2)]
         
-        # Initialize pipes
-        self.pipes = []
+        # Initialize pipes (ring buffer, cursor follows the birds' column)
+        column_x = self.birds[0].x
+        if any(bird.x != column_x for bird in self.birds):
+            raise ValueError('All birds in a game must share the same x position')
+        self.pipes.clear(column_x)
         self.add_pipe()
         
-        # State for AI
-        self.living_birds = len(self.birds)
+        # State for AI (compact list of living birds, shrinks as birds die)
+        self.alive_birds = [bird for bird in self.birds if bird.alive]
+        self.living_birds = len(self.alive_birds)
+        
+        # Repaint the whole screen on the next render
+        self.full_redraw = True
         
         return self.get_state()
     
     def add_pipe(self):
-        self.pipes.append(Pipe(self.width))
+        self.pipes.add(self.width, self.course.next_gap())
     
     def get_state(self):
         """Get the current game state for AI"""
@@ -200,11 +362,7 @@ class FlappyBird:
             return None
         
         bird = self.birds[0]  # Use the first bird for state
-        next_pipe = None
-        for pipe in self.pipes:
-            if pipe.x + pipe.width > bird.x:
-                next_pipe = pipe
-                break
+        next_pipe = self.pipes.next_pipe()
         
         if next_pipe:
             return {
@@ -215,53 +373,64 @@ class FlappyBird:
             }
         return None
     
+    @hook('game.step')
     def step(self, action=None):
         """Step the game forward one frame, return (state, reward, done)"""
         self.frame_count += 1
         reward = 0.1  # Small reward for surviving each frame
         
         # Add new pipes
-        if self.frame_count % 60 == 0:
+        if self.frame_count % PIPE_SPAWN_INTERVAL == 0:
             self.add_pipe()
         
         # Process action for human mode
         if self.mode == GameMode.HUMAN and action:
             self.birds[0].jump()
         
-        # Update pipes
-        temp_pipes = []
-        for pipe in self.pipes:
-            if pipe.update():  # Returns False if pipe is off-screen
-                temp_pipes.append(pipe)
-        self.pipes = temp_pipes
-        
-        # Update birds and check collisions
-        for bird in self.birds:
-            if not bird.alive:
-                continue
-                
+        # Update pipes (off-screen pipes dropped, cursors moved past the birds' column)
+        passed = self.pipes.advance()
+        
+        # Next two pipes ahead of the birds (same for every bird)
+        think = self.mode in (GameMode.AI, GameMode.HEADLESS)
+        next_pipe = self.pipes.next_pipe()
+        second_pipe = self.pipes.second_pipe()
+        
+        # Update living birds and check collisions
+        deaths = False
+        for bird in self.alive_birds:
             # Apply AI brain if in AI mode
-            if self.mode in (GameMode.AI, GameMode.HEADLESS):
-                bird.apply_brain(self.pipes)
+            if think and next_pipe is not None:
+                bird.apply_brain(next_pipe, second_pipe)
             
             # Update bird position
             if not bird.update():  # Bird hit the ground
                 bird.alive = False
                 self.living_birds -= 1
+                deaths = True
             
-            # Check pipe collisions
-            for pipe in self.pipes:
+            # Score for pipes passed this frame (every bird alive at the start of the frame)
+            if passed:
+                bird.score += passed
+                self.score = max(self.score, bird.score)
+                reward = 1  # Positive reward for passing a pipe
+            
+            # Check pipe collisions (only pipes from the cursor on can overlap the birds' column)
+            for i in range(self.pipes.next, len(self.pipes)):
+                pipe = self.pipes[i]
+                if pipe.x >= bird.x + bird.width:
+                    break
                 if bird.collides_with(pipe):
+                    # Aynı karede yere düşen kuş iki kez sayılmasın
+                    if bird.alive:
+                        self.living_birds -= 1
                     bird.alive = False
-                    self.living_birds -= 1
+                    deaths = True
                     reward = -1  # Negative reward for collision
                     break
-                    
-                # Score for passing pipes
-                if pipe.is_passed_by(bird):
-                    bird.score += 1
-                    self.score = max(self.score, bird.score)
-                    reward = 1  # Positive reward for passing a pipe
+        
+        # Drop dead birds so the next frame only walks survivors
+        if deaths:
+            self.alive_birds = [bird for bird in self.alive_birds if bird.alive]
         
         # Check if game is over (all birds dead)
         done = self.living_birds <= 0
@@ -269,76 +438,121 @@ class FlappyBird:
         
         return self.get_state(), reward, done
     
+    def pipe_surface(self, height):
+        """Pipe image scaled to the given height (built once per height)"""
+        surface = self.pipe_surfaces.get(height)
+        if surface is None:
+            surface = pygame.transform.scale(self.pipe_img, (PIPE_WIDTH, max(height, 0)))
+            self.pipe_surfaces[height] = surface
+        return surface
+    
+    def bird_label(self, number):
+        """Number label of a bird, built once per number
+        
+        Returns (surface, offset of the label from the bird's top-left corner).
+        The cache is keyed by number only, so it stays as large as the biggest
+        population even though every generation brings new bird colors.
+        """
+        label = self.bird_labels.get(number)
+        if label is None:
+            surface = self.font.render(str(number), True, (0, 0, 0)).convert_alpha()
+            rect = surface.get_rect(center=(BIRD_WIDTH // 2, BIRD_HEIGHT // 2))
+            label = (surface, rect.topleft)
+            self.bird_labels[number] = label
+        return label
+    
+    def draw_text(self, text, color, topleft=None, center=None):
+        """Draw text from cached per-character glyphs, return the covered rect"""
+        glyphs = []
+        width = height = 0
+        for char in text:
+            glyph = self.glyphs.get((char, color))
+            if glyph is None:
+                glyph = self.font.render(char, True, color)
+                self.glyphs[(char, color)] = glyph
+            glyphs.append(glyph)
+            width += glyph.get_width()
+            height = max(height, glyph.get_height())
+        rect = pygame.Rect(0, 0, width, height)
+        if center is not None:
+            rect.center = center
+        else:
+            rect.topleft = topleft
+        x = rect.x
+        for glyph in glyphs:
+            self.screen.blit(glyph, (x, rect.y))
+            x += glyph.get_width()
+        return rect
+    
+    @hook('game.render')
     def render(self):
-        """Render the game state"""
+        """Render the game state
+        
+        Pipe surfaces, bird labels and text glyphs come from caches. Only the
+        areas drawn in this frame and the previous one are sent to the display;
+        the whole screen is sent after a reset.
+        """
         if self.mode == GameMode.HEADLESS:
             return
         
         # Clear screen
         self.screen.fill(self.bg_color)
+        rects = []
         
         # Draw pipes
         for pipe in self.pipes:
             # Upper pipe
-            upper_pipe = self.pipe_img.copy()
             upper_pipe_height = pipe.gap_y - pipe.gap_height // 2
-            upper_pipe = pygame.transform.scale(upper_pipe, (pipe.width, upper_pipe_height))
-            self.screen.blit(upper_pipe, (pipe.x, 0))
+            rects.append(self.screen.blit(self.pipe_surface(upper_pipe_height), (pipe.x, 0)))
             
             # Lower pipe
-            lower_pipe = self.pipe_img.copy()
             lower_pipe_y = pipe.gap_y + pipe.gap_height // 2
             lower_pipe_height = self.ground_y - lower_pipe_y
-            lower_pipe = pygame.transform.scale(lower_pipe, (pipe.width, lower_pipe_height))
-            self.screen.blit(lower_pipe, (pipe.x, lower_pipe_y))
+            rects.append(self.screen.blit(self.pipe_surface(lower_pipe_height), (pipe.x, lower_pipe_y)))
             
-        # Draw birds
+        # Draw birds (colored rectangle with the bird number in the center)
+        bird_rects = []
         for i, bird in enumerate(self.birds):
             if bird.alive:
-                # Draw bird as a yellow rectangle
-                pygame.draw.rect(self.screen, bird.color, 
-                               (bird.x, bird.y, bird.width, bird.height))
-                
-                # Draw bird number in the center of the bird rectangle
-                number_text = self.font.render(str(i+1), True, (0, 0, 0))
-                text_rect = number_text.get_rect(center=(bird.x + bird.width//2, bird.y + bird.height//2))
-                self.screen.blit(number_text, text_rect)
+                bird_rect = self.screen.fill(bird.color, (bird.x, bird.y, BIRD_WIDTH, BIRD_HEIGHT))
+                label, (dx, dy) = self.bird_label(i + 1)
+                bird_rects.append(bird_rect.union(self.screen.blit(label, (bird.x + dx, bird.y + dy))))
+        if bird_rects:
+            rects.append(bird_rects[0].unionall(bird_rects[1:]))
         
         # Draw ground
         pygame.draw.rect(self.screen, (139, 69, 19), 
                         (0, self.ground_y, self.width, self.height - self.ground_y))
         
         # Draw score
-        score_text = self.font.render(f'Score: {self.score}', True, (0, 0, 0))
-        self.screen.blit(score_text, (10, 10))
+        rects.append(self.draw_text(f'Score: {self.score}', (0, 0, 0), topleft=(10, 10)))
 
         # Draw alive birds count
-        birds_text = self.font.render(f"Birds: {self.living_birds}", True, (255, 255, 255))
-        self.screen.blit(birds_text, (10, 50))
+        rects.append(self.draw_text(f"Birds: {self.living_birds}", (255, 255, 255), topleft=(10, 50)))
         
         # Eğitim modu için ek bilgiler
         if self.mode == GameMode.AI:
             # Çerçeve sayısı
-            frame_text = self.font.render(f"Frame: {self.frame_count}", True, (255, 255, 255))
-            self.screen.blit(frame_text, (10, 90))
+            rects.append(self.draw_text(f"Frame: {self.frame_count}", (255, 255, 255), topleft=(10, 90)))
             
             # En yakın borunun konumu
-            next_pipe = None
-            for pipe in self.pipes:
-                if pipe.x + pipe.width > 100:  # Kuşun x konumu
-                    next_pipe = pipe
-                    break
+            next_pipe = self.pipes.next_pipe()
             
             if next_pipe:
-                pipe_text = self.font.render(f"Next Pipe: {int(next_pipe.x)}, Gap: {int(next_pipe.gap_y)}", True, (255, 255, 255))
-                self.screen.blit(pipe_text, (10, 130))
+                rects.append(self.draw_text(f"Next Pipe: {int(next_pipe.x)}, Gap: {int(next_pipe.gap_y)}",
+                                            (255, 255, 255), topleft=(10, 130)))
         
         if self.game_over:
-            game_over_text = self.font.render('Game Over! Press R to restart', True, (255, 0, 0))
-            text_rect = game_over_text.get_rect(center=(self.width/2, self.height/2))
-            self.screen.blit(game_over_text, text_rect)
+            rects.append(self.draw_text('Game Over! Press R to restart', (255, 0, 0),
+                                        center=(self.width/2, self.height/2)))
         
-        pygame.display.flip()
+        # Send only the changed areas (this frame's and the previous frame's) to the display
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.dirty_rects + rects)
+        self.dirty_rects = rects
         self.clock.tick(self.fps)
     
     def run_human(self):
@@ -0,0 +1,182 @@
+"""Ada modeli: ayrı süreçlerde bağımsız popülasyonlar ve periyodik göç.
+
+Her ada kendi popülasyonunu, mutasyon ayarlarını ve parkur tohumlarını
+kullanarak ayrı bir işçi süreçte evrilir (EvolutionaryAlgorithm ve headless
+motor). Adalar her migration_interval nesilde bir durur, en iyi genomlarını
+ana sürece gönderir ve halka düzeninde bir önceki adanın göçmenlerini alır.
+Göç kanalı bir multiprocessing.Pipe'tır; genomlar ham float64 baytları olarak
+taşınır.
+
+Senkronizasyon sadece göç anlarında olduğu için adalar arası iletişim azdır
+ve çekirdek sayısıyla neredeyse doğrusal ölçeklenir. Her adanın numpy ve
+parkur tohumları sabit olduğundan sonuçlar süreçlerin zamanlamasından
+bağımsızdır ve tekrarlanabilir.
+"""
+import multiprocessing as mp
+import random
+import traceback
+import numpy as np
+from neural_network import NeuralNetwork, EvolutionaryAlgorithm
+from jit_engine import create_engine
+
+LAYER_SIZES = (8, 24, 1)
+
+def island_settings(islands, seed=None):
+    """Varsayılan ada ayarları: farklı mutasyon oranları/miktarları ve ayrı tohumlar
+
+    İlk ada train_headless ile aynı ayarları kullanır (mutasyon oranı 0.2,
+    miktarı 0.3); diğerleri daha keşifçi ve daha tutucu ayarlara yayılır.
+    """
+    seeds = random.Random(seed)
+    rates = [0.2] + np.linspace(0.1, 0.3, islands - 1).tolist()
+    amounts = [0.3] + np.linspace(0.2, 0.5, islands - 1).tolist()
+    settings = []
+    for i in range(islands):
+        settings.append({
+            'mutation_rate': rates[i],
+            'mutation_amount': amounts[i],
+            'numpy_seed': seeds.getrandbits(32),
+            'course_seed': seeds.getrandbits(32),
+        })
+    return settings
+
+def _island_main(conn, setting, population_size, generations, max_steps, migration_interval,
+                 migrants, engine, crossover_rate):
+    """Ada süreci: nesilleri simüle et, her göç anında göçmen gönder ve al"""
+    try:
+        np.random.seed(setting['numpy_seed'])
+        evolution = EvolutionaryAlgorithm(
+            population_size=population_size,
+            input_size=LAYER_SIZES[0],
+            hidden_size=LAYER_SIZES[1],
+            output_size=LAYER_SIZES[2],
+            mutation_rate=setting['mutation_rate'],
+            mutation_amount=setting['mutation_amount'],
+            survival_rate=0.3,
+            crossover_rate=setting.get('crossover_rate', crossover_rate)
+        )
+        game = create_engine(engine)
+        course_seeds = random.Random(setting['course_seed'])
+        best_score = 0
+
+        for generation in range(generations):
+            game.reset(evolution.population_network(), seed=course_seeds.getrandbits(32))
+            game.run(max_steps)
+            results = game.results()
+            best_score = max(best_score, int(results['scores'].max()))
+
+            # Değerlendirilen genomlar (yeni nesil ayrı bir matriste üretilir)
+            evaluated = evolution.genomes
+            evolution.create_next_generation_from_results(results)
+
+            if (generation + 1) % migration_interval == 0 or generation + 1 == generations:
+                # En iyi genomları ve ada durumunu gönder
+                top = evaluated[evolution.selection_indices(evolution.last_fitness)[:migrants]]
+                conn.send(('epoch', {'generation': generation, 'best_fitness': evolution.best_fitness,
+                                     'best_score': best_score}))
+                conn.send_bytes(np.ascontiguousarray(top).tobytes())
+
+                # Komşu adanın göçmenleri son çocukların yerini alır (elit korunur)
+                if generation + 1 < generations:
+                    incoming = np.frombuffer(conn.recv_bytes(), dtype=np.float64)
+                    incoming = incoming.reshape(-1, evolution.genomes.shape[1])
+                    if len(incoming):
+                        evolution.genomes[-len(incoming):] = incoming
+
+        conn.send(('done', {
+            'best_genome': evolution.best_model.genome if evolution.best_model else np.empty(0),
+            'best_fitness': evolution.best_fitness,
+            'best_score': best_score,
+            'fitness_history': evolution.fitness_history,
+            'avg_fitness_history': evolution.avg_fitness_history,
+        }))
+    except Exception:
+        conn.send(('error', traceback.format_exc()))
+    finally:
+        conn.close()
+
+class IslandModel:
+    """Ada süreçlerini başlatır, göçü yönlendirir ve sonuçları toplar
+
+    settings her ada için bir sözlük listesidir (island_settings ile aynı
+    anahtarlar: mutation_rate, mutation_amount, numpy_seed, course_seed,
+    isteğe bağlı crossover_rate). migrants kadar en iyi genom her
+    migration_interval nesilde halkadaki bir sonraki adaya gönderilir.
+    """
+    def __init__(self, settings, population_size=100, max_steps=1000, migration_interval=10,
+                 migrants=2, engine='numpy', crossover_rate=0.0):
+        if migrants >= population_size:
+            raise ValueError('Göçmen sayısı ada popülasyonundan küçük olmalı')
+        self.settings = settings
+        self.population_size = population_size
+        self.max_steps = max_steps
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.engine = engine
+        self.crossover_rate = crossover_rate
+        self.history = []  # Her göç anında ada durumlarının listesi
+
+    def _receive(self, conn, index):
+        try:
+            kind, payload = conn.recv()
+        except EOFError:
+            raise RuntimeError(f'Ada {index} beklenmedik şekilde kapandı')
+        if kind == 'error':
+            raise RuntimeError(f'Ada {index} hata verdi:\n{payload}')
+        return kind, payload
+
+    def run(self, generations, on_epoch=None):
+        """Tüm adaları generations nesil evrilt, ada sonuçlarını döndür
+
+        on_epoch(adalar_durumu) her göç anında ada durum sözlüklerinin
+        listesiyle çağrılır (ilerleme gösterimi için).
+        """
+        connections = []
+        processes = []
+        try:
+            for setting in self.settings:
+                parent_conn, child_conn = mp.Pipe()
+                process = mp.Process(target=_island_main, daemon=True, args=(
+                    child_conn, setting, self.population_size, generations, self.max_steps,
+                    self.migration_interval, self.migrants, self.engine, self.crossover_rate))
+                process.start()
+                child_conn.close()
+                connections.append(parent_conn)
+                processes.append(process)
+
+            epochs = -(-generations // self.migration_interval)
+            for epoch in range(epochs):
+                states = []
+                outgoing = []
+                for index, conn in enumerate(connections):
+                    _, state = self._receive(conn, index)
+                    states.append(state)
+                    outgoing.append(conn.recv_bytes())
+                self.history.append(states)
+                if on_epoch:
+                    on_epoch(states)
+
+                # Halka düzeninde göç: i. ada (i - 1). adanın göçmenlerini alır
+                if epoch + 1 < epochs:
+                    for index, conn in enumerate(connections):
+                        conn.send_bytes(outgoing[index - 1] if len(connections) > 1 else b'')
+
+            results = [self._receive(conn, index)[1] for index, conn in enumerate(connections)]
+            for process in processes:
+                process.join()
+            return results
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for conn in connections:
+                conn.close()
+
+    @staticmethod
+    def best(results):
+        """Tüm adalar arasında en iyi genomu NeuralNetwork olarak döndür"""
+        index = max(range(len(results)), key=lambda i: results[i]['best_fitness'])
+        genome = results[index]['best_genome']
+        if not genome.size:
+            return None, index
+        return NeuralNetwork(*LAYER_SIZES, genome=np.array(genome, dtype=np.float64)), index
@@ -0,0 +1,271 @@
+"""İsteğe bağlı numba ile derlenmiş headless oyun motoru (--engine=jit).
+
+VectorFlappyBird her karede NumPy işlemleri çağırır; küçük popülasyonlarda ve
+çok uzun nesillerde süre bu çağrıların sabit maliyetine gider. Bu motor algı,
+iki katmanlı sigmoid ileri besleme, fizik, çarpışma ve skorlamayı tek bir
+derlenmiş döngüde birleştirir.
+
+Boru düzeni kuşlardan bağımsızdır (boruların eklenmesi, kayması ve silinmesi
+sadece kare sayısına bağlıdır). Bu yüzden önce her kare için öndeki iki boru,
+kuş sütunuyla çakışan borular ve geçilen boru sayısı bir kez hesaplanır, sonra
+her kuş kendi ölümüne kadar bu çizelge üzerinde bağımsız olarak simüle edilir.
+Kare içindeki işlem sırası ve kayan nokta işlemleri VectorFlappyBird.step ile
+aynıdır. Tek fark ileri beslemedeki toplamaların sırasıdır; bu sadece çıktısı
+0.5'e yuvarlama hatası kadar yakın olan (pratikte görülmeyen) kararları
+etkileyebilir.
+
+numba kurulu değilse create_engine VectorFlappyBird'e geri döner.
+"""
+import warnings
+import numpy as np
+from neural_network import PopulationNetwork
+from game import (PipeCourse, GRAVITY, JUMP_STRENGTH, BIRD_WIDTH, BIRD_HEIGHT, BIRD_MAX_Y,
+                  PIPE_WIDTH, PIPE_SPEED, PIPE_GAP_HEIGHT, PIPE_SPAWN_INTERVAL)
+from vector_game import VectorFlappyBird
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+ENGINES = ('numpy', 'jit')
+
+def available():
+    """numba yüklü mü"""
+    return numba is not None
+
+def _pipe_schedule(max_steps, width, bird_x):
+    """Her kare için boru çizelgesi (kare 1..max_steps, indeks kare - 1)
+
+    Döner: öndeki ilk/ikinci borunun sırası ve x konumu (-1: yok), kuş
+    sütunuyla çakışan en fazla iki boru (-1: yok) ve o karede geçilen boru sayısı.
+    """
+    capacity = max_steps // PIPE_SPAWN_INTERVAL + 2
+    pipe_x = np.empty(capacity)
+    passed = np.zeros(capacity, dtype=np.bool_)
+    first = 0  # Ekrandaki ilk borunun sırası
+    count = 1  # Şimdiye kadar eklenen boru sayısı
+    pipe_x[0] = width
+
+    ahead = np.full((max_steps, 2), -1, dtype=np.int64)
+    ahead_x = np.zeros((max_steps, 2))
+    overlap = np.full((max_steps, 2), -1, dtype=np.int64)
+    passes = np.zeros(max_steps, dtype=np.int64)
+
+    for f in range(max_steps):
+        frame = f + 1
+        if frame % PIPE_SPAWN_INTERVAL == 0:
+            pipe_x[count] = width
+            count += 1
+        for k in range(first, count):
+            pipe_x[k] -= PIPE_SPEED
+        while first < count and not pipe_x[first] > -PIPE_WIDTH:
+            first += 1
+
+        n_ahead = 0
+        n_overlap = 0
+        for k in range(first, count):
+            x = pipe_x[k]
+            if x + PIPE_WIDTH > bird_x and n_ahead < 2:
+                ahead[f, n_ahead] = k
+                ahead_x[f, n_ahead] = x
+                n_ahead += 1
+            if not passed[k] and bird_x > x + PIPE_WIDTH:
+                passed[k] = True
+                passes[f] += 1
+            if bird_x + BIRD_WIDTH > x and bird_x < x + PIPE_WIDTH and n_overlap < 2:
+                overlap[f, n_overlap] = k
+                n_overlap += 1
+    return ahead, ahead_x, overlap, passes
+
+def _sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+def _simulate_birds(w_ih, w_ho, b_h, b_o, gaps, course_idx, ahead, ahead_x, overlap, passes,
+                    bird_x, bird_y, out_scores, out_alive, out_y, out_velocity, out_frames):
+    """Her kuşu ölene veya çizelge bitene kadar simüle et (kuş başına sonuçları yazar)"""
+    n_birds = w_ih.shape[0]
+    n_inputs = w_ih.shape[1]
+    n_hidden = w_ih.shape[2]
+    max_steps = ahead.shape[0]
+    inputs = np.empty(n_inputs)
+    half_gap = PIPE_GAP_HEIGHT / 2
+    collision_half_gap = PIPE_GAP_HEIGHT // 2
+
+    for i in range(n_birds):
+        course = course_idx[i]
+        y = float(bird_y)
+        velocity = 0.0
+        score = 0
+        alive = True
+        frame = max_steps
+
+        for f in range(max_steps):
+            # Algı ve karar (Bird.apply_brain / VectorFlappyBird._features ile aynı girdiler)
+            jump = False
+            k = ahead[f, 0]
+            if k >= 0:
+                gap = gaps[course, k]
+                inputs[0] = y / 400
+                inputs[1] = velocity / 10
+                inputs[2] = (ahead_x[f, 0] - bird_x) / 400
+                inputs[3] = (y - gap) / 200
+                inputs[4] = (y - (gap - half_gap)) / 200
+                inputs[5] = ((gap + half_gap) - y) / 200
+                k2 = ahead[f, 1]
+                if k2 >= 0:
+                    inputs[6] = (ahead_x[f, 1] - bird_x) / 400
+                    inputs[7] = (y - gaps[course, k2]) / 200
+                else:
+                    inputs[6] = 1.0
+                    inputs[7] = 0.0
+
+                final = 0.0
+                for j in range(n_hidden):
+                    total = 0.0
+                    for m in range(n_inputs):
+                        total += inputs[m] * w_ih[i, m, j]
+                    final += _sigmoid(total + b_h[i, 0, j]) * w_ho[i, j, 0]
+                jump = _sigmoid(final + b_o[i, 0, 0]) > 0.5
+
+            # Fizik (zıplama, yerçekimi, tavan)
+            if jump:
+                velocity = float(JUMP_STRENGTH)
+            velocity = velocity + GRAVITY
+            y = y + velocity
+            if y < 0:
+                y = 0.0
+                velocity = 0.0
+
+            # Yere düşme, boru geçişleri (karenin başında yaşayan kuşa sayılır) ve çarpışma
+            dead = y >= BIRD_MAX_Y
+            score += passes[f]
+            for o in range(2):
+                k = overlap[f, o]
+                if k >= 0:
+                    gap = gaps[course, k]
+                    if y < gap - collision_half_gap or y + BIRD_HEIGHT > gap + collision_half_gap:
+                        dead = True
+
+            if dead:
+                alive = False
+                frame = f + 1
+                break
+
+        out_scores[i] = score
+        out_alive[i] = alive
+        out_y[i] = y
+        out_velocity[i] = velocity
+        out_frames[i] = frame
+
+_kernels = None
+
+def _compiled():
+    """Derlenmiş fonksiyonlar (ilk kullanımda derlenir, derleme diskte önbelleklenir)"""
+    global _kernels
+    if _kernels is None:
+        global _sigmoid
+        _sigmoid = numba.njit(cache=True)(_sigmoid)
+        _kernels = (numba.njit(cache=True)(_pipe_schedule),
+                    numba.njit(cache=True)(_simulate_birds))
+    return _kernels
+
+class JitFlappyBird:
+    """VectorFlappyBird ile aynı arayüze sahip, numba ile derlenmiş headless motor
+
+    reset(), run() ve results() VectorFlappyBird ile aynı şekilde kullanılır
+    (birden fazla parkur dahil). Kare kare step(), fast_step() ve erken bitirme
+    (top_k) desteklenmez; run() her zaman tüm nesli simüle eder.
+    """
+    def __init__(self, width=800, height=600, bird_x=100, bird_y=300, seed=None, gaps=None):
+        if numba is None:
+            raise ImportError('JitFlappyBird için numba gerekli (pip install numba)')
+        self.width = width
+        self.height = height
+        self.bird_x = bird_x
+        self.bird_y = bird_y
+        self.course = PipeCourse(seed, gaps)
+        self.courses = [self.course]
+        self.reset([])
+
+    def reset(self, brains, seed=None, seeds=None):
+        """Oyunu verilen beyinlerle sıfırla (VectorFlappyBird.reset ile aynı anlam)"""
+        if isinstance(brains, PopulationNetwork):
+            self.network = brains
+        else:
+            self.network = PopulationNetwork.from_networks(brains) if len(brains) else None
+        if seeds is not None:
+            self.courses = [PipeCourse(course_seed) for course_seed in seeds]
+            self.course = self.courses[0]
+        elif seed is not None:
+            self.course = PipeCourse(seed)
+            self.courses = [self.course]
+
+        n_courses = len(self.courses)
+        n = len(self.network) * n_courses if self.network is not None else 0
+        self.course_idx = np.repeat(np.arange(n_courses), n // n_courses)
+        self.scores = np.zeros(n, dtype=np.int64)
+        self.alive = np.ones(n, dtype=bool)
+        self.y = np.full(n, float(self.bird_y))
+        self.velocity = np.zeros(n)
+        self.frame_count = 0
+        self.score = 0
+        self.game_over = False
+
+    def _gaps(self, n_pipes):
+        """Her parkurun ilk n_pipes boru boşluğu, (parkurlar, borular)"""
+        gaps = np.empty((len(self.courses), n_pipes))
+        for c, course in enumerate(self.courses):
+            course.reset()
+            for k in range(n_pipes):
+                gaps[c, k] = course.next_gap()
+        return gaps
+
+    def run(self, max_steps, top_k=None, fast=False):
+        """Tüm kuşlar ölene veya maksimum adım sayısına ulaşılana kadar oyna (top_k ve fast yok sayılır)"""
+        pipe_schedule, simulate_birds = _compiled()
+        n = len(self.scores)
+        if n == 0:
+            self.frame_count = 1
+            self.game_over = True
+            return self.score
+
+        ahead, ahead_x, overlap, passes = pipe_schedule(max_steps, float(self.width), self.bird_x)
+        gaps = self._gaps(max_steps // PIPE_SPAWN_INTERVAL + 2)
+
+        genomes = self.network.genomes
+        if len(self.courses) > 1:
+            genomes = np.tile(genomes, (len(self.courses), 1))
+        network = PopulationNetwork(genomes, self.network.input_size, self.network.hidden_size,
+                                    self.network.output_size)
+        frames = np.empty(n, dtype=np.int64)
+        simulate_birds(network.weights_input_hidden, network.weights_hidden_output,
+                       network.bias_hidden, network.bias_output, gaps, self.course_idx,
+                       ahead, ahead_x, overlap, passes, self.bird_x, self.bird_y,
+                       self.scores, self.alive, self.y, self.velocity, frames)
+
+        self.frame_count = int(frames.max())
+        self.score = int(self.scores.max())
+        self.game_over = not self.alive.any()
+        return self.score
+
+    def results(self):
+        """Uygunluk hesabı için gereken son durumu diziler olarak döndür"""
+        return {
+            'scores': self.scores,
+            'alive': self.alive,
+            'y': self.y,
+            'velocity': self.velocity,
+            'frames': self.frame_count,
+            'courses': len(self.courses),
+        }
+
+def create_engine(engine='numpy', **kwargs):
+    """İstenen headless motoru oluştur; 'jit' için numba yoksa uyarı verip NumPy motoruna dön"""
+    if engine not in ENGINES:
+        raise ValueError(f'Bilinmeyen motor: {engine} (seçenekler: {", ".join(ENGINES)})')
+    if engine == 'jit':
+        if available():
+            return JitFlappyBird(**kwargs)
+        warnings.warn('numba bulunamadı, NumPy motoru (VectorFlappyBird) kullanılıyor')
+    return VectorFlappyBird(**kwargs)
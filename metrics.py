@@ -0,0 +1,116 @@
+"""Nesil başına eğitim metriklerini sadece-ekleme dosyalarına yazan kayıtçılar.
+
+Her nesil için bir kayıt yazılır ve hemen diske aktarılır; çalışan bir eğitimin
+dosyası dışarıdan (pano, betik) okunabilir.
+
+    JsonlMetricsSink  - satır başına bir JSON nesnesi (.jsonl)
+    BinaryMetricsSink - sabit genişlikli ikili kayıtlar (.fbm): başlıkta alan
+                        listesi bulunur, read_binary_metrics dosyayı bellek
+                        eşlemesiyle açıp sütunları kopyalamadan döndürür
+"""
+import json
+import os
+import struct
+import numpy as np
+from artifacts import ensure_dir
+
+# Kayıt alanları ve ikili biçimdeki tipleri
+METRIC_FIELDS = (
+    ('generation', '<i8'),
+    ('best_fitness', '<f8'),
+    ('avg_fitness', '<f8'),
+    ('median_fitness', '<f8'),
+    ('best_score', '<i8'),
+    ('frames', '<i8'),
+    ('survivors', '<i8'),
+    ('simulate_time', '<f8'),
+    ('evolve_time', '<f8'),
+    ('save_time', '<f8'),
+    ('total_time', '<f8'),
+    ('birds_per_sec', '<f8'),
+    ('cache_hits', '<i8'),
+    ('cache_misses', '<i8'),
+    ('cache_hit_rate', '<f8'),
+)
+
+BINARY_MAGIC = b'FBMT'
+_BINARY_HEADER = struct.Struct('<4sI')
+
+class JsonlMetricsSink:
+    """Her kaydı bir JSON satırı olarak dosyanın sonuna ekler"""
+    def __init__(self, path):
+        ensure_dir(os.path.dirname(path))
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class BinaryMetricsSink:
+    """Kayıtları METRIC_FIELDS düzeninde sabit genişlikli ikili satırlar olarak ekler
+
+    Dosya başlığı: b'FBMT', JSON alan listesinin uzunluğu (uint32) ve alan
+    listesi. Var olan bir dosyaya sadece aynı alan listesiyle eklenebilir.
+    Kayıtta olmayan alanlar 0 yazılır, METRIC_FIELDS dışındaki anahtarlar atlanır.
+    """
+    def __init__(self, path, fields=METRIC_FIELDS):
+        ensure_dir(os.path.dirname(path))
+        self.path = path
+        self.dtype = np.dtype([(name, dtype) for name, dtype in fields])
+        descr = json.dumps([[name, dtype] for name, dtype in fields]).encode('utf-8')
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            if _read_binary_header(path)[0] != self.dtype:
+                raise ValueError(f'{path} farklı bir metrik alan listesiyle yazılmış')
+        else:
+            with open(path, 'wb') as f:
+                f.write(_BINARY_HEADER.pack(BINARY_MAGIC, len(descr)) + descr)
+
+        self.file = open(path, 'ab')
+        self.row = np.zeros(1, dtype=self.dtype)
+
+    def write(self, record):
+        self.row[0] = tuple(record.get(name, 0) for name in self.dtype.names)
+        self.file.write(self.row.tobytes())
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def _read_binary_header(path):
+    """(kayıt tipi, veri başlangıç konumu)"""
+    with open(path, 'rb') as f:
+        magic, length = _BINARY_HEADER.unpack(f.read(_BINARY_HEADER.size))
+        if magic != BINARY_MAGIC:
+            raise ValueError(f'{path} bir ikili metrik dosyası değil')
+        fields = json.loads(f.read(length).decode('utf-8'))
+    return np.dtype([(name, dtype) for name, dtype in fields]), _BINARY_HEADER.size + length
+
+def read_binary_metrics(path):
+    """İkili metrik dosyasını yapılandırılmış dizi olarak aç (sütunlar: metrics['best_fitness'])
+
+    Dosya bellek eşlemesiyle açılır; sadece okunan sütunlar/satırlar diskten yüklenir.
+    Yarım yazılmış son satır yok sayılır.
+    """
+    dtype, offset = _read_binary_header(path)
+    count = (os.path.getsize(path) - offset) // dtype.itemsize
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+
+def read_jsonl_metrics(path):
+    """JSONL metrik dosyasındaki kayıtları sırayla üret (yarım son satır atlanır)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.endswith('\n'):
+                yield json.loads(line)
+
+def open_metrics_sink(path):
+    """Uzantıya göre kayıtçı aç: .fbm ikili, diğerleri JSONL"""
+    if path.endswith('.fbm'):
+        return BinaryMetricsSink(path)
+    return JsonlMetricsSink(path)
@@ -0,0 +1,118 @@
+"""Sinir ağları için sürümlü ikili model dosyası biçimi (.fbnn).
+
+Dosya 64 baytlık bir başlık ve ardından bitişik kayıtlardan oluşur:
+
+    başlık: sihirli değer b'FBNN', sürüm (uint16), veri tipi kodu (uint8),
+            ayrılmış (uint8), girdi/gizli/çıktı boyutları (3 x uint32),
+            kayıt sayısı (uint64) - hepsi little-endian
+    kayıt:  etiket (int64) + P elemanlı düz genom (float64 veya float32)
+
+Bir dosya tek bir modeli, tüm bir popülasyonu (etiket = üye sırası) veya
+nesiller boyunca kaydedilen en iyi modellerin yığınını (etiket = nesil)
+tutabilir. Yükleme kayıtları kopyalamadan bellek eşlemesiyle (memmap) açar.
+"""
+import os
+import struct
+import numpy as np
+from neural_network import NeuralNetwork, PopulationNetwork, genome_size
+
+MAGIC = b'FBNN'
+VERSION = 1
+HEADER_SIZE = 64
+MODEL_EXTENSION = '.fbnn'
+
+_HEADER = struct.Struct('<4sHBBIIIQ')
+_DTYPES = {0: np.dtype('<f8'), 1: np.dtype('<f4')}
+_DTYPE_CODES = {dtype: code for code, dtype in _DTYPES.items()}
+
+def _record_dtype(genome_dtype, layer_sizes):
+    return np.dtype([('label', '<i8'), ('genome', genome_dtype, (genome_size(*layer_sizes),))])
+
+def _pack_header(dtype_code, layer_sizes, count):
+    header = _HEADER.pack(MAGIC, VERSION, dtype_code, 0, *layer_sizes, count)
+    return header.ljust(HEADER_SIZE, b'\0')
+
+def read_header(path):
+    """Başlığı oku: (genom veri tipi, (girdi, gizli, çıktı), kayıt sayısı)"""
+    with open(path, 'rb') as f:
+        data = f.read(HEADER_SIZE)
+    if len(data) < _HEADER.size or data[:4] != MAGIC:
+        raise ValueError(f'{path} bir {MODEL_EXTENSION} model dosyası değil')
+
+    magic, version, dtype_code, _, input_size, hidden_size, output_size, count = _HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f'Desteklenmeyen model dosyası sürümü: {version}')
+    if dtype_code not in _DTYPES:
+        raise ValueError(f'Bilinmeyen veri tipi kodu: {dtype_code}')
+    return _DTYPES[dtype_code], (input_size, hidden_size, output_size), count
+
+def is_model_file(path):
+    """Dosya ikili model biçiminde mi (sihirli değere göre)"""
+    with open(path, 'rb') as f:
+        return f.read(4) == MAGIC
+
+def _records(genomes, labels, genome_dtype, layer_sizes):
+    genomes = np.atleast_2d(genomes)
+    records = np.empty(len(genomes), dtype=_record_dtype(genome_dtype, layer_sizes))
+    records['label'] = np.arange(len(genomes)) if labels is None else labels
+    records['genome'] = genomes
+    return records
+
+def save_genomes(path, genomes, layer_sizes, labels=None, dtype=np.float64):
+    """(N, P) genom matrisini (veya tek genomu) yeni bir dosyaya yaz"""
+    genome_dtype = np.dtype(dtype).newbyteorder('<')
+    records = _records(genomes, labels, genome_dtype, layer_sizes)
+    with open(path, 'wb') as f:
+        f.write(_pack_header(_DTYPE_CODES[genome_dtype], layer_sizes, len(records)))
+        f.write(records.tobytes())
+    return path
+
+def append_genomes(path, genomes, layer_sizes, labels=None, dtype=np.float64):
+    """Genomları mevcut dosyanın sonuna ekle (dosya yoksa oluştur)"""
+    if not os.path.exists(path):
+        return save_genomes(path, genomes, layer_sizes, labels, dtype)
+
+    genome_dtype, file_sizes, count = read_header(path)
+    if tuple(file_sizes) != tuple(layer_sizes):
+        raise ValueError(f'Katman boyutları uyuşmuyor: dosya {file_sizes}, genom {tuple(layer_sizes)}')
+
+    records = _records(genomes, labels, genome_dtype, layer_sizes)
+    with open(path, 'r+b') as f:
+        f.seek(HEADER_SIZE + count * records.dtype.itemsize)
+        f.write(records.tobytes())
+        f.truncate()
+        # Kayıtlar yazıldıktan sonra sayacı güncelle
+        f.seek(0)
+        f.write(_pack_header(_DTYPE_CODES[genome_dtype], layer_sizes, count + len(records)))
+    return path
+
+def load_genomes(path):
+    """Dosyayı kopyalamadan aç: (genomlar (N, P), etiketler (N,), katman boyutları)
+
+    Diziler yazmada kopyalanan (copy-on-write) bir bellek eşlemesinin görünümleridir;
+    mutasyon gibi değişiklikler dosyaya yansımaz.
+    """
+    genome_dtype, layer_sizes, count = read_header(path)
+    if count == 0:
+        return np.empty((0, genome_size(*layer_sizes)), dtype=genome_dtype), np.empty(0, dtype=np.int64), layer_sizes
+
+    records = np.memmap(path, dtype=_record_dtype(genome_dtype, layer_sizes), mode='c',
+                        offset=HEADER_SIZE, shape=(count,))
+    return records['genome'], records['label'], layer_sizes
+
+def save_network(path, network, label=0, dtype=np.float64):
+    """Tek bir NeuralNetwork'ü kaydet"""
+    layer_sizes = (network.input_size, network.hidden_size, network.output_size)
+    return save_genomes(path, network.genome, layer_sizes, labels=[label], dtype=dtype)
+
+def load_network(path, index=-1):
+    """Dosyadaki index. kaydı NeuralNetwork olarak yükle (varsayılan: son kayıt)"""
+    genomes, _, layer_sizes = load_genomes(path)
+    if len(genomes) == 0:
+        raise ValueError(f'{path} hiç model içermiyor')
+    return NeuralNetwork(*layer_sizes, genome=genomes[index])
+
+def load_population(path):
+    """Dosyadaki tüm kayıtları tek bir PopulationNetwork olarak yükle"""
+    genomes, _, layer_sizes = load_genomes(path)
+    return PopulationNetwork(genomes, *layer_sizes)
@@ -1,25 +1,120 @@
 import numpy as np
-import random
-import copy
 import pickle
 import os
-import matplotlib.pyplot as plt
-from tqdm import tqdm
+from profiling import hook
+
+def genome_size(input_size, hidden_size, output_size):
+    """Bir ağın tüm parametrelerini tutan düz genom vektörünün uzunluğu"""
+    return input_size * hidden_size + hidden_size * output_size + hidden_size + output_size
+
+def genome_views(genome, input_size, hidden_size, output_size):
+    """Düz genomdan (veya (N, P) genom matrisinden) katman görünümlerini döndür
+    
+    Dönen diziler kopya değil, genom üzerine yeniden şekillendirilmiş görünümlerdir.
+    Genom sırası: girdi-gizli ağırlıklar, gizli-çıktı ağırlıklar, gizli bias, çıktı bias.
+    """
+    lead = genome.shape[:-1]
+    shapes = [(input_size, hidden_size), (hidden_size, output_size), (1, hidden_size), (1, output_size)]
+    views = []
+    offset = 0
+    for rows, cols in shapes:
+        size = rows * cols
+        views.append(genome[..., offset:offset + size].reshape(lead + (rows, cols)))
+        offset += size
+    return views
 
 class NeuralNetwork:
-    def __init__(self, input_size, hidden_size, output_size):
-        # Ağırlıkları rastgele değerlerle başlat (küçük değerlerle çarparak başlangıç gradyanlarını kontrol et)
-        self.weights_input_hidden = np.random.randn(input_size, hidden_size) * 0.1
-        self.weights_hidden_output = np.random.randn(hidden_size, output_size) * 0.1
+    def __init__(self, input_size, hidden_size, output_size, genome=None):
+        self.input_size = input_size
+        self.hidden_size = hidden_size
+        self.output_size = output_size
         
-        # Bias değerlerini sıfır olarak başlat
-        self.bias_hidden = np.zeros((1, hidden_size))
-        self.bias_output = np.zeros((1, output_size))
+        if genome is None:
+            genome = np.zeros(genome_size(input_size, hidden_size, output_size))
+            self._set_genome(genome)
+            
+            # Ağırlıkları rastgele değerlerle başlat (küçük değerlerle çarparak başlangıç gradyanlarını kontrol et)
+            self.weights_input_hidden = np.random.randn(input_size, hidden_size) * 0.1
+            self.weights_hidden_output = np.random.randn(hidden_size, output_size) * 0.1
+            
+            # Bias değerleri sıfır olarak kalır
+        else:
+            # Verilen genomu (ör. popülasyon matrisinin bir satırı) kopyalamadan kullan
+            self._set_genome(genome)
+    
+    def _set_genome(self, genome):
+        # Tüm parametreler tek bir bitişik vektörde, katmanlar bu vektörün görünümleri
+        self.genome = genome
+        (self._weights_input_hidden, self._weights_hidden_output,
+         self._bias_hidden, self._bias_output) = genome_views(
+            genome, self.input_size, self.hidden_size, self.output_size)
+    
+    # Katman atamaları yeni dizi oluşturmaz, değerleri genomun içine yazar
+    @property
+    def weights_input_hidden(self):
+        return self._weights_input_hidden
+    
+    @weights_input_hidden.setter
+    def weights_input_hidden(self, value):
+        self._weights_input_hidden[...] = value
+    
+    @property
+    def weights_hidden_output(self):
+        return self._weights_hidden_output
+    
+    @weights_hidden_output.setter
+    def weights_hidden_output(self, value):
+        self._weights_hidden_output[...] = value
+    
+    @property
+    def bias_hidden(self):
+        return self._bias_hidden
+    
+    @bias_hidden.setter
+    def bias_hidden(self, value):
+        self._bias_hidden[...] = value
+    
+    @property
+    def bias_output(self):
+        return self._bias_output
+    
+    @bias_output.setter
+    def bias_output(self, value):
+        self._bias_output[...] = value
+    
+    def __getstate__(self):
+        return {
+            'input_size': self.input_size,
+            'hidden_size': self.hidden_size,
+            'output_size': self.output_size,
+            'genome': self.genome,
+        }
+    
+    def __setstate__(self, state):
+        if 'genome' in state:
+            self.input_size = state['input_size']
+            self.hidden_size = state['hidden_size']
+            self.output_size = state['output_size']
+            self._set_genome(np.array(state['genome'], dtype=np.float64))
+            return
+        
+        # Eski pickle dosyaları: katmanlar ayrı diziler olarak saklanmış
+        input_size, hidden_size = state['weights_input_hidden'].shape
+        output_size = state['weights_hidden_output'].shape[1]
+        self.input_size = input_size
+        self.hidden_size = hidden_size
+        self.output_size = output_size
+        self._set_genome(np.zeros(genome_size(input_size, hidden_size, output_size)))
+        self.weights_input_hidden = state['weights_input_hidden']
+        self.weights_hidden_output = state['weights_hidden_output']
+        self.bias_hidden = state['bias_hidden']
+        self.bias_output = state['bias_output']
     
     def sigmoid(self, x):
         # Sigmoid aktivasyon fonksiyonu (0-1 arasında değer döndürür)
         return 1 / (1 + np.exp(-x))
     
+    @hook('network.predict')
     def predict(self, inputs):
         # Girdileri numpy dizisine dönüştür
         inputs = np.array(inputs).reshape(1, -1)
@@ -34,45 +129,153 @@ class NeuralNetwork:
         return final_outputs[0][0]  # Tek çıktı değerini döndür
     
     def copy(self):
-        # Sinir ağının derin kopyasını oluştur
-        return copy.deepcopy(self)
+        # Genomun tek bir kopyasıyla yeni bir ağ oluştur (deepcopy gerekmez)
+        return NeuralNetwork(self.input_size, self.hidden_size, self.output_size,
+                             genome=self.genome.copy())
     
+    @hook('network.mutate')
     def mutate(self, mutation_rate=0.1, mutation_amount=0.5):
         """Sinir ağının ağırlıklarını ve bias değerlerini rastgele mutasyona uğrat"""
+        # Hangi parametrelerin mutasyona uğrayacağını belirleyen maske oluştur
+        mask = np.random.random(self.genome.shape) < mutation_rate
         
-        # Bir ağırlık matrisini mutasyona uğratmak için yardımcı fonksiyon
-        def mutate_matrix(matrix):
-            # Hangi ağırlıkların mutasyona uğrayacağını belirleyen maske oluştur
-            mask = np.random.random(matrix.shape) < mutation_rate
-            
-            # Rastgele pertürbasyonlar oluştur
-            perturbations = np.random.randn(*matrix.shape) * mutation_amount
-            
-            # Mutasyonları sadece maskenin True olduğu yerlere uygula
-            matrix[mask] += perturbations[mask]
-            
-            return matrix
+        # Rastgele pertürbasyonlar oluştur
+        perturbations = np.random.randn(*self.genome.shape) * mutation_amount
         
-        # Her ağırlık ve bias setini mutasyona uğrat
-        self.weights_input_hidden = mutate_matrix(self.weights_input_hidden)
-        self.weights_hidden_output = mutate_matrix(self.weights_hidden_output)
-        self.bias_hidden = mutate_matrix(self.bias_hidden)
-        self.bias_output = mutate_matrix(self.bias_output)
+        # Mutasyonları sadece maskenin True olduğu yerlere uygula (tüm katmanlar tek seferde)
+        self.genome[mask] += perturbations[mask]
     
     def save(self, filename):
-        """Sinir ağını bir dosyaya kaydet"""
-        with open(filename, 'wb') as f:
-            pickle.dump(self, f)
+        """Sinir ağını ikili model dosyasına (.fbnn) kaydet
+        
+        Yol .pkl ile bitiyorsa eski pickle biçimi yazılır, böylece bu yolu
+        pickle ile okuyan yükleyiciler çalışmaya devam eder.
+        """
+        if filename.endswith('.pkl'):
+            with open(filename, 'wb') as f:
+                pickle.dump(self, f)
+            return
+        import model_io
+        model_io.save_network(filename, self)
     
     @staticmethod
-    def load(filename):
-        """Bir dosyadan sinir ağı yükle"""
+    def load(filename, index=-1):
+        """Bir dosyadan sinir ağı yükle
+        
+        İkili model dosyalarında index. kayıt (varsayılan: son kayıt) bellek
+        eşlemesiyle yüklenir; eski .pkl dosyaları pickle ile yüklenmeye devam eder.
+        """
+        import model_io
+        if model_io.is_model_file(filename):
+            return model_io.load_network(filename, index)
+        
         with open(filename, 'rb') as f:
             return pickle.load(f)
 
+class PopulationNetwork:
+    """Popülasyondaki tüm sinir ağlarını tek bir yapıda tutar.
+
+    Parametreler (N, P) boyutlu bir genom matrisinde saklanır; her üyenin ağırlıkları
+    ve bias değerleri bu matris üzerinde 3 boyutlu görünümlerdir, böylece tüm
+    popülasyon için tek bir ileri besleme yapılabilir.
+    """
+    def __init__(self, genomes, input_size, hidden_size, output_size):
+        self.genomes = genomes
+        self.input_size = input_size
+        self.hidden_size = hidden_size
+        self.output_size = output_size
+        # Şekiller: (N, girdi, gizli), (N, gizli, çıktı), (N, 1, gizli), (N, 1, çıktı)
+        (self.weights_input_hidden, self.weights_hidden_output,
+         self.bias_hidden, self.bias_output) = genome_views(genomes, input_size, hidden_size, output_size)
+    
+    @classmethod
+    def from_networks(cls, networks):
+        """NeuralNetwork listesini tek bir popülasyon ağına yığ"""
+        first = networks[0]
+        return cls(np.stack([n.genome for n in networks]),
+                   first.input_size, first.hidden_size, first.output_size)
+    
+    def __len__(self):
+        return len(self.genomes)
+    
+    def take(self, rows):
+        """Seçilen üyelerden (indeks veya boolean maske) oluşan yeni bir popülasyon ağı"""
+        return PopulationNetwork(self.genomes[rows], self.input_size, self.hidden_size, self.output_size)
+    
+    def sigmoid(self, x):
+        return 1 / (1 + np.exp(-x))
+    
+    @hook('population.predict')
+    def predict(self, inputs, idx=None):
+        """(M, girdi) boyutlu girdi matrisi için M çıktı döndür
+        
+        idx verilirse i. satır idx[i] numaralı üyenin ağıyla değerlendirilir,
+        verilmezse satırlar popülasyon sırasıyla eşleşir. (M, K, girdi) boyutlu
+        girdiler de kabul edilir; her üye kendi K girdisini değerlendirir ve
+        (M, K) çıktı döner.
+        """
+        w_ih, w_ho = self.weights_input_hidden, self.weights_hidden_output
+        b_h, b_o = self.bias_hidden, self.bias_output
+        if idx is not None:
+            w_ih, w_ho, b_h, b_o = w_ih[idx], w_ho[idx], b_h[idx], b_o[idx]
+        
+        inputs = np.asarray(inputs, dtype=np.float64)
+        single = inputs.ndim == 2
+        if single:
+            inputs = inputs[:, np.newaxis, :]
+        
+        # Her katman için tek bir yığınlanmış matris çarpımı
+        hidden_outputs = self.sigmoid(np.matmul(inputs, w_ih) + b_h)
+        final_outputs = self.sigmoid(np.matmul(hidden_outputs, w_ho) + b_o)[..., 0]
+        
+        return final_outputs[:, 0] if single else final_outputs
+    
+    def decide(self, inputs, idx=None):
+        """Her satır için zıplama kararını (çıktı > 0.5) döndür"""
+        return self.predict(inputs, idx) > 0.5
+    
+    def network(self, i):
+        """i. üyeyi bağımsız bir NeuralNetwork olarak döndür"""
+        return NeuralNetwork(self.input_size, self.hidden_size, self.output_size,
+                             genome=self.genomes[i].copy())
+    
+    def to_networks(self):
+        return [self.network(i) for i in range(len(self))]
+
+def plot_fitness(fitness_history, avg_fitness_history, save_path=None):
+    """En iyi ve ortalama uygunluk geçmişinin grafiğini çiz
+    
+    Dosyaya kaydederken pyplot yerine bağımsız bir Figure kullanılır: şekil
+    pyplot'un genel listesine eklenmez (uzun eğitimlerde bellek sızmaz) ve
+    arka plan iş parçacığından güvenle çizilebilir.
+    """
+    # matplotlib sadece grafik çizilirken yüklenir (eğitim çekirdeği onsuz içe aktarılabilir)
+    if save_path:
+        from matplotlib.figure import Figure
+        figure = Figure(figsize=(10, 5))
+        axes = figure.add_subplot()
+    else:
+        import matplotlib.pyplot as plt
+        figure, axes = plt.subplots(figsize=(10, 5))
+    
+    axes.plot(fitness_history, label='En İyi Uygunluk')
+    axes.plot(avg_fitness_history, label='Ortalama Uygunluk')
+    axes.set_xlabel('Nesil')
+    axes.set_ylabel('Uygunluk Değeri')
+    axes.set_title('Nesiller Boyunca Uygunluk Değeri')
+    axes.legend()
+    axes.grid(True)
+    
+    if save_path:
+        figure.savefig(save_path)
+    else:
+        plt.show()
+        plt.close(figure)
+
 class EvolutionaryAlgorithm:
     def __init__(self, population_size=100, input_size=4, hidden_size=8, output_size=1, 
-                 mutation_rate=0.1, mutation_amount=0.5, survival_rate=0.2, crossover_rate=0.0):
+                 mutation_rate=0.1, mutation_amount=0.5, survival_rate=0.2, crossover_rate=0.0,
+                 fitness_aggregate='mean', fitness_quantile=0.25):
         # Popülasyon parametreleri
         self.population_size = population_size
         self.input_size = input_size
@@ -83,7 +286,13 @@ class EvolutionaryAlgorithm:
         self.mutation_rate = mutation_rate  # Mutasyon olasılığı
         self.mutation_amount = mutation_amount  # Mutasyon miktarı
         self.survival_rate = survival_rate  # Hayatta kalma oranı
-        self.crossover_rate = crossover_rate  # Çaprazlama oranı (şu anda kullanılmıyor)
+        self.crossover_rate = crossover_rate  # Çocukların çaprazlama ile üretilme oranı
+        
+        # Çoklu parkur uygunluğunun birleştirilmesi ('mean', 'min' veya 'quantile')
+        if fitness_aggregate not in ('mean', 'min', 'quantile'):
+            raise ValueError(f'Bilinmeyen uygunluk birleştirme yöntemi: {fitness_aggregate}')
+        self.fitness_aggregate = fitness_aggregate
+        self.fitness_quantile = fitness_quantile
         
         # En iyi model takibi
         self.best_fitness = 0
@@ -91,156 +300,344 @@ class EvolutionaryAlgorithm:
         self.generation = 0
         self.fitness_history = []
         self.avg_fitness_history = []
+        self.last_fitness = None  # Son değerlendirilen neslin uygunluk dizisi (N,)
         
-        # Popülasyonu başlat
-        self.population = self._initialize_population()
+        # Popülasyonu başlat (tüm genomlar tek bir (N, P) matriste)
+        self.genomes = self._initialize_genomes()
+        self._population = None
     
-    def _initialize_population(self):
-        """Sinir ağlarından oluşan bir popülasyon başlat"""
-        return [NeuralNetwork(self.input_size, self.hidden_size, self.output_size) 
-                for _ in range(self.population_size)]
+    def _initialize_genomes(self):
+        """Rastgele ağırlıklı bir genom matrisi oluştur (NeuralNetwork ile aynı dağılım)"""
+        genomes = np.zeros((self.population_size,
+                            genome_size(self.input_size, self.hidden_size, self.output_size)))
+        weights_input_hidden, weights_hidden_output, _, _ = genome_views(
+            genomes, self.input_size, self.hidden_size, self.output_size)
+        weights_input_hidden[...] = np.random.randn(*weights_input_hidden.shape) * 0.1
+        weights_hidden_output[...] = np.random.randn(*weights_hidden_output.shape) * 0.1
+        return genomes
     
-    def calculate_fitness(self, birds):
-        """Her kuş için uygunluk değerini hesapla"""
-        total_fitness = 0
-        max_fitness = 0
+    def _population_views(self):
+        """Genom matrisinin her satırını kopyalamadan kullanan NeuralNetwork listesi"""
+        return [NeuralNetwork(self.input_size, self.hidden_size, self.output_size, genome=genome)
+                for genome in self.genomes]
+    
+    @property
+    def population(self):
+        # Kuş başına ağ listesi sadece gerektiğinde (ilk erişimde) oluşturulur;
+        # dizi tabanlı eğitim döngüsü nesil başına N nesne oluşturmaz
+        if self._population is None:
+            self._population = self._population_views()
+        return self._population
+    
+    def population_network(self):
+        """Popülasyonu toplu değerlendirme için tek bir PopulationNetwork olarak döndür"""
+        return PopulationNetwork(self.genomes, self.input_size, self.hidden_size, self.output_size)
+    
+    def compute_fitness(self, scores=None, alive=None, y=None, bird_x=100, next_pipe=None,
+                        course_scores=None, course_alive=None):
+        """Uygunluk değerlerini (N,) dizi işlemleriyle hesapla
         
-        # Boru değerlendirmesi için oyun durumu (eğer pipes erişilebilirse)
-        pipes = None
-        if hasattr(birds[0], 'game') and hasattr(birds[0].game, 'pipes'):
-            pipes = birds[0].game.pipes
+        scores, alive ve y kuş başına (N,) dizilerdir. course_scores ve
+        course_alive (K, N) verilirse parkur başına uygunluklar aggregate_fitness
+        ile birleştirilir. next_pipe verilirse henüz boru geçmemiş yaşayan
+        kuşlara bu boruya yakınlık ve boşluğa hizalanma bonusu eklenir.
+        """
+        if course_scores is not None:
+            # Birden fazla parkurda değerlendirilen kuşlar: parkur başına uygunluk birleştirilir
+            return np.asarray(self.aggregate_fitness(course_scores * 20 + 2 * course_alive), dtype=np.float64)
         
-        for i, bird in enumerate(birds):
-            # Uygunluk değeri öncelikle skora dayanır (daha yüksek çarpan)
-            fitness = bird.score * 20  # Daha yüksek çarpan
-            
-            # Henüz bir boru geçmemiş ama yaşayan kuşlara ek bonus ver
-            if bird.score == 0 and bird.alive and pipes:
-                # En yakın boruyu bul
-                next_pipe = None
-                for pipe in pipes:
-                    if pipe.x + pipe.width > bird.x:
-                        next_pipe = pipe
-                        break
-                
-                if next_pipe:
-                    # Boruya yakınlık için bonus (boru yaklaştıkça artan)
-                    proximity = max(0, 1 - ((next_pipe.x - bird.x) / 400))
-                    fitness += proximity * 3
-                    
-                    # Boşluğa hizalanma için bonus
-                    alignment = max(0, 1 - (abs(next_pipe.gap_y - bird.y) / 150))
-                    fitness += alignment * 5
-            
-            # Hayatta kalma bonusu
-            if bird.alive:
-                fitness += 2
-            
-            # Uygunluk değerini kaydet
-            bird.fitness = fitness
+        # Uygunluk değeri öncelikle skora dayanır (daha yüksek çarpan)
+        fitness = np.asarray(scores, dtype=np.float64) * 20
+        
+        # Henüz bir boru geçmemiş ama yaşayan kuşlara ek bonus ver
+        if next_pipe is not None:
+            eligible = (np.asarray(scores) == 0) & alive
             
-            total_fitness += fitness
-            max_fitness = max(max_fitness, fitness)
+            # Boruya yakınlık için bonus (boru yaklaştıkça artan)
+            proximity = np.maximum(0, 1 - ((next_pipe.x - np.asarray(bird_x)) / 400))
+            fitness += np.where(eligible, proximity * 3, 0)
             
-            # En iyi modeli sakla
-            if fitness > self.best_fitness:
-                self.best_fitness = fitness
-                self.best_model = bird.brain.copy()
+            # Boşluğa hizalanma için bonus
+            alignment = np.maximum(0, 1 - (np.abs(next_pipe.gap_y - np.asarray(y)) / 150))
+            fitness += np.where(eligible, alignment * 5, 0)
         
-        # Uygunluk istatistiklerini güncelle
-        self.fitness_history.append(max_fitness)
-        self.avg_fitness_history.append(total_fitness / len(birds))
+        # Hayatta kalma bonusu
+        fitness += np.where(alive, 2, 0)
+        return fitness
+    
+    @hook('evolution.fitness')
+    def calculate_fitness(self, birds):
+        """Her kuş için uygunluk değerini hesapla"""
+        # Boru değerlendirmesi için oyun durumu (eğer pipes erişilebilirse)
+        next_pipe = None
+        if hasattr(birds[0], 'game') and hasattr(birds[0].game, 'pipes') and birds[0].game.pipes:
+            # En yakın boru (PipeRing imleci)
+            next_pipe = birds[0].game.pipes.next_pipe()
+        
+        if birds[0].course_scores is not None:
+            fitness = self.compute_fitness(
+                course_scores=np.stack([bird.course_scores for bird in birds], axis=1),
+                course_alive=np.stack([bird.course_alive for bird in birds], axis=1))
+        else:
+            fitness = self.compute_fitness(
+                scores=np.array([bird.score for bird in birds]),
+                alive=np.array([bird.alive for bird in birds], dtype=bool),
+                y=np.array([bird.y for bird in birds], dtype=np.float64),
+                bird_x=np.array([bird.x for bird in birds], dtype=np.float64),
+                next_pipe=next_pipe)
+        
+        # Uygunluk değerlerini kaydet
+        for bird, value in zip(birds, fitness.tolist()):
+            bird.fitness = value
+        
+        # En iyi modeli sakla (nesil başına en fazla bir kopya)
+        total_fitness, max_fitness, best = self._record_fitness(fitness)
+        if best is not None:
+            self.best_model = birds[best].brain.copy()
         
         return total_fitness, max_fitness
     
-    def selection(self, birds):
-        """Uygunluk değerine göre kuşları seçme (uygunluk orantılı seçim)"""
-        # Kuşları uygunluk değerine göre azalan sırada sırala
-        sorted_birds = sorted(birds, key=lambda x: x.fitness, reverse=True)
+    @hook('evolution.fitness')
+    def fitness_from_results(self, results):
+        """Simülasyon sonuçlarından (VectorFlappyBird.results()) popülasyon sırasıyla uygunluk dizisi
         
-        # En iyi performans gösterenleri seç
-        survivors_count = max(2, int(self.population_size * self.survival_rate))
-        survivors = sorted_birds[:survivors_count]
+        Kuş nesnesi oluşturulmaz; sonuçlar K parkurdan geliyorsa (parkur, kuş)
+        sırasındaki diziler (K, N) şekline getirilip birleştirilir.
+        """
+        n_courses = results.get('courses', 1)
+        if n_courses > 1:
+            return self.compute_fitness(course_scores=results['scores'].reshape(n_courses, -1),
+                                        course_alive=results['alive'].reshape(n_courses, -1))
+        return self.compute_fitness(scores=results['scores'], alive=results['alive'], y=results['y'])
+    
+    def _record_fitness(self, fitness):
+        """Nesil istatistiklerini güncelle, döndür: (toplam, en yüksek, yeni en iyi kuşun sırası veya None)"""
+        best = int(np.argmax(fitness))
+        max_fitness = float(fitness[best])
+        total_fitness = float(fitness.sum())
+        self.last_fitness = fitness
+        
+        # Uygunluk istatistiklerini güncelle
+        self.fitness_history.append(max_fitness)
+        self.avg_fitness_history.append(total_fitness / len(fitness))
         
-        return survivors
+        # En iyi uygunluk aşıldı mı (eşitlikte ilk kuş, önceki en iyi korunur)
+        if max_fitness > self.best_fitness:
+            self.best_fitness = max_fitness
+            return total_fitness, max_fitness, best
+        return total_fitness, max_fitness, None
+    
+    def aggregate_fitness(self, course_fitness):
+        """Parkur başına uygunluk değerlerini (K,) veya (K, N) ilk eksen boyunca birleştir"""
+        if self.fitness_aggregate == 'min':
+            return np.min(course_fitness, axis=0)
+        if self.fitness_aggregate == 'quantile':
+            return np.quantile(course_fitness, self.fitness_quantile, axis=0)
+        return np.mean(course_fitness, axis=0)
+    
+    def survivors_count(self):
+        """Her nesilde ebeveyn olarak seçilecek kuş sayısı"""
+        return max(2, int(self.population_size * self.survival_rate))
+    
+    @hook('evolution.selection')
+    def selection_indices(self, fitness):
+        """En yüksek uygunluklu survivors_count() kuşun sırası, azalan uygunlukla
+        
+        Tam sıralama yerine argpartition ile ilk k seçilir, sadece bu k eleman
+        sıralanır. Eşit uygunluklarda önce gelen kuş önce seçilir (kararlı
+        sıralamayla aynı sonuç).
+        """
+        fitness = np.asarray(fitness)
+        k = min(self.survivors_count(), len(fitness))
+        if k < len(fitness):
+            # k. en yüksek değer; sınırdaki eşitlerden sadece ilk gelenler alınır
+            threshold = fitness[np.argpartition(fitness, len(fitness) - k)[len(fitness) - k]]
+            above = np.flatnonzero(fitness > threshold)
+            ties = np.flatnonzero(fitness == threshold)[:k - len(above)]
+            top = np.sort(np.concatenate([above, ties]))
+        else:
+            top = np.arange(len(fitness))
+        return top[np.argsort(-fitness[top], kind='stable')]
+    
+    def selection(self, birds):
+        """Uygunluk değerine göre kuşları seçme (en iyi survivors_count() kuş)"""
+        fitness = np.array([bird.fitness for bird in birds], dtype=np.float64)
+        return [birds[i] for i in self.selection_indices(fitness)]
     
     def crossover(self, parent1, parent2):
-        """İki ebeveynden çaprazlama ile çocuk oluştur (şu anki uygulamada kullanılmıyor)"""
-        # Bu basit bir uygulama - daha karmaşık çaprazlama yöntemleriyle genişletilebilir
-        child = NeuralNetwork(self.input_size, self.hidden_size, self.output_size)
+        """İki ebeveynden çaprazlama ile tek bir çocuk oluştur"""
+        # Her parametre için rastgele bir ebeveyn seç (tüm genom tek seferde)
+        mask = np.random.random(parent1.genome.shape) < 0.5
+        genome = np.where(mask, parent1.genome, parent2.genome)
+        
+        return NeuralNetwork(self.input_size, self.hidden_size, self.output_size, genome=genome)
+    
+    @hook('evolution.vary')
+    def vary(self, parent_genomes, n_children):
+        """Ebeveyn genom matrisinden (S, P) tüm çocukları (n_children, P) üret
         
-        # Her ebeveynden rastgele ağırlıklar seç
-        mask = np.random.random(parent1.weights_input_hidden.shape) < 0.5
-        child.weights_input_hidden = np.where(mask, parent1.weights_input_hidden, parent2.weights_input_hidden)
+        Her çocuk için rastgele bir ebeveyn seçilir; crossover_rate olasılıkla ikinci
+        bir ebeveynle tekdüze çaprazlanır, ardından tüm çocuklara maskeli Gauss
+        mutasyonu uygulanır. Nesil başına sadece birkaç rastgele sayı çağrısı yapılır.
+        """
+        n_parents = len(parent_genomes)
         
-        mask = np.random.random(parent1.weights_hidden_output.shape) < 0.5
-        child.weights_hidden_output = np.where(mask, parent1.weights_hidden_output, parent2.weights_hidden_output)
+        # Ebeveyn seçimi (satır kopyaları)
+        children = parent_genomes[np.random.randint(n_parents, size=n_children)]
         
-        mask = np.random.random(parent1.bias_hidden.shape) < 0.5
-        child.bias_hidden = np.where(mask, parent1.bias_hidden, parent2.bias_hidden)
+        # Tekdüze çaprazlama
+        if self.crossover_rate > 0:
+            second_parents = parent_genomes[np.random.randint(n_parents, size=n_children)]
+            crossed = np.random.random(n_children) < self.crossover_rate
+            mask = (np.random.random(children.shape) < 0.5) & crossed[:, np.newaxis]
+            children[mask] = second_parents[mask]
         
-        mask = np.random.random(parent1.bias_output.shape) < 0.5
-        child.bias_output = np.where(mask, parent1.bias_output, parent2.bias_output)
+        # Maskeli Gauss mutasyonu
+        mask = np.random.random(children.shape) < self.mutation_rate
+        perturbations = np.random.randn(*children.shape) * self.mutation_amount
+        children[mask] += perturbations[mask]
         
-        return child
+        return children
     
+    @hook('evolution.next_generation')
     def create_next_generation(self, birds):
         """Bir sonraki nesil kuşları oluştur"""
         # Uygunluk değerlerini hesapla
-        total_fitness, max_fitness = self.calculate_fitness(birds)
+        self.calculate_fitness(birds)
         
         # Ebeveynleri seç
         parents = self.selection(birds)
         
-        # Yeni popülasyon oluştur
-        new_population = []
+        self._breed(np.stack([parent.brain.genome for parent in parents]))
+        return self.population
+    
+    @hook('evolution.next_generation')
+    def create_next_generation_from_results(self, results):
+        """Simülasyon sonuçlarından doğrudan bir sonraki nesli oluştur
+        
+        Sonuçların satırları self.genomes ile aynı sırada olmalıdır (ör.
+        population_network() ile simüle edilmiş nesil). Kuş nesneleri
+        oluşturulmaz; create_next_generation(make_birds(...)) ile aynı nesli
+        üretir ve yeni nesli PopulationNetwork olarak döndürür.
+        """
+        fitness = self.fitness_from_results(results)
+        
+        # En iyi genomu sakla (nesil başına en fazla bir kopya)
+        _, _, best = self._record_fitness(fitness)
+        if best is not None:
+            self.best_model = NeuralNetwork(self.input_size, self.hidden_size, self.output_size,
+                                            genome=self.genomes[best].copy())
+        
+        # Ebeveynler genom matrisinden tek bir satır seçimiyle alınır
+        self._breed(self.genomes[self.selection_indices(fitness)])
+        return self.population_network()
+    
+    def _breed(self, parent_genomes):
+        """Ebeveyn genomlarından (S, P) yeni nesli oluştur ve popülasyonu değiştir"""
+        # Yeni genom matrisi oluştur (kopyalar satır atamasıyla yapılır)
+        new_genomes = np.empty_like(self.genomes)
+        start = 0
         
         # Her zaman en iyi modeli koru (elitizm)
         if self.best_model:
-            new_population.append(self.best_model.copy())
+            new_genomes[0] = self.best_model.genome
+            start = 1
         
-        # Popülasyonun geri kalanını doldur
-        while len(new_population) < self.population_size:
-            # Rastgele ebeveyn seç
-            parent = random.choice(parents)
-            
-            # Ebeveynin beyninin bir kopyasını oluştur
-            child_brain = parent.brain.copy()
-            
-            # Mutasyon uygula
-            child_brain.mutate(self.mutation_rate, self.mutation_amount)
-            
-            new_population.append(child_brain)
+        # Popülasyonun geri kalanını tek seferde üret
+        new_genomes[start:] = self.vary(parent_genomes, self.population_size - start)
+        
+        self.genomes = new_genomes
+        self._population = None
         
-        self.population = new_population
         self.generation += 1
+    
+    def plot_fitness_history(self, save_path=None, writer=None):
+        """Uygunluk değeri geçmişini görselleştir
         
-        return new_population
-    
-    def plot_fitness_history(self, save_path=None):
-        """Uygunluk değeri geçmişini görselleştir"""
-        plt.figure(figsize=(10, 5))
-        plt.plot(self.fitness_history, label='En İyi Uygunluk')
-        plt.plot(self.avg_fitness_history, label='Ortalama Uygunluk')
-        plt.xlabel('Nesil')
-        plt.ylabel('Uygunluk Değeri')
-        plt.title('Nesiller Boyunca Uygunluk Değeri')
-        plt.legend()
-        plt.grid(True)
-        
-        if save_path:
-            plt.savefig(save_path)
+        writer (artifacts.ArtifactWriter) verilirse geçmişlerin kopyası alınır ve
+        grafik arka planda çizilip kaydedilir.
+        """
+        if writer and save_path:
+            writer.submit(plot_fitness, list(self.fitness_history),
+                          list(self.avg_fitness_history), save_path)
         else:
-            plt.show()
+            plot_fitness(self.fitness_history, self.avg_fitness_history, save_path)
     
-    def save_best_model(self, save_dir='models'):
-        """En iyi modeli kaydet"""
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
+    def save_best_model(self, save_dir='models', writer=None):
+        """En iyi modeli nesil etiketiyle best_models.fbnn yığınına ekle
+        
+        writer (artifacts.ArtifactWriter) verilirse genomun kopyası arka planda
+        yazılır; dönen yol yazma bitmeden döner.
+        """
+        import model_io
+        from artifacts import ensure_dir
+        
+        ensure_dir(save_dir)
         
         if self.best_model:
-            model_path = os.path.join(save_dir, f'best_model_gen_{self.generation}.pkl')
-            self.best_model.save(model_path)
+            model_path = os.path.join(save_dir, 'best_models' + model_io.MODEL_EXTENSION)
+            args = (model_path, self.best_model.genome.copy(),
+                    (self.input_size, self.hidden_size, self.output_size))
+            kwargs = {'labels': [self.generation]}
+            if writer:
+                writer.submit(model_io.append_genomes, *args, **kwargs)
+            else:
+                model_io.append_genomes(*args, **kwargs)
             return model_path
         
-        return None 
\ No newline at end of file
+        return None
+    
+    def save_population(self, path):
+        """Tüm popülasyonu (genom matrisi) tek bir ikili model dosyasına kaydet"""
+        import model_io
+        return model_io.save_genomes(path, self.genomes,
+                                     (self.input_size, self.hidden_size, self.output_size))
+    
+    def get_state(self):
+        """Eğitimi birebir sürdürmek için gereken tam durumu dizi sözlüğü olarak döndür
+        
+        Genom matrisi ve geçmişler kopyalanır; dönen sözlük eğitim devam ederken
+        başka bir iş parçacığında güvenle diske yazılabilir.
+        """
+        rng = np.random.get_state(legacy=False)
+        return {
+            'layer_sizes': np.array([self.input_size, self.hidden_size, self.output_size]),
+            'genomes': self.genomes.copy(),
+            'best_genome': (self.best_model.genome.copy() if self.best_model
+                            else np.empty(0)),
+            'best_fitness': np.float64(self.best_fitness),
+            'generation': np.int64(self.generation),
+            'fitness_history': np.array(self.fitness_history, dtype=np.float64),
+            'avg_fitness_history': np.array(self.avg_fitness_history, dtype=np.float64),
+            'rng_key': rng['state']['key'].copy(),
+            'rng_pos': np.int64(rng['state']['pos']),
+            'rng_has_gauss': np.int64(rng['has_gauss']),
+            'rng_gauss': np.float64(rng['gauss']),
+        }
+    
+    def set_state(self, state):
+        """get_state() ile alınmış durumu geri yükle (global numpy üreteci dahil)"""
+        layer_sizes = tuple(int(size) for size in state['layer_sizes'])
+        if layer_sizes != (self.input_size, self.hidden_size, self.output_size):
+            raise ValueError(f'Katman boyutları uyuşmuyor: durum {layer_sizes}, '
+                             f'algoritma {(self.input_size, self.hidden_size, self.output_size)}')
+        
+        self.genomes = np.array(state['genomes'], dtype=np.float64)
+        self.population_size = len(self.genomes)
+        self._population = None
+        
+        best_genome = state['best_genome']
+        self.best_model = (NeuralNetwork(*layer_sizes, genome=np.array(best_genome, dtype=np.float64))
+                           if best_genome.size else None)
+        self.best_fitness = float(state['best_fitness'])
+        self.generation = int(state['generation'])
+        self.fitness_history = state['fitness_history'].tolist()
+        self.avg_fitness_history = state['avg_fitness_history'].tolist()
+        
+        np.random.set_state({
+            'bit_generator': 'MT19937',
+            'state': {'key': np.array(state['rng_key'], dtype=np.uint32),
+                      'pos': int(state['rng_pos'])},
+            'has_gauss': int(state['rng_has_gauss']),
+            'gauss': float(state['rng_gauss']),
+        })
@@ -0,0 +1,109 @@
+import multiprocessing as mp
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from neural_network import PopulationNetwork
+from jit_engine import create_engine
+
+# İşçi süreç başına açık paylaşılan bellek blokları ve oyun motoru
+_worker_shm = {}
+_worker_game = None
+
+def _attach(shm_name, shape):
+    """Paylaşılan bellekteki genom matrisini kopyalamadan aç"""
+    shm = _worker_shm.get(shm_name)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _worker_shm[shm_name] = shm
+    return np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+def _evaluate_shard(shm_name, shape, layer_sizes, start, stop, seed, max_steps, fast, engine):
+    """Popülasyonun [start, stop) parçasını bir işçi süreçte simüle et"""
+    global _worker_game
+    if _worker_game is None:
+        _worker_game = create_engine(engine)
+
+    genomes = _attach(shm_name, shape)
+    network = PopulationNetwork(genomes[start:stop], *layer_sizes)
+
+    if isinstance(seed, (list, tuple)):
+        _worker_game.reset(network, seeds=seed)
+    else:
+        _worker_game.reset(network, seed=seed)
+    _worker_game.run(max_steps, fast=fast)
+
+    # Sadece uygunluk hesabı için gereken küçük dizileri geri gönder
+    return {key: (value.copy() if isinstance(value, np.ndarray) else value)
+            for key, value in _worker_game.results().items()}
+
+def merge_shards(shards):
+    """Popülasyon parçalarının sonuçlarını (sırayla) tek bir results() sözlüğünde birleştir
+
+    Birden fazla parkurda her parçanın dizileri (parkur, kuş) sırasındadır;
+    birleştirme parkur başına yapılır, böylece sonuç VectorFlappyBird ile aynı
+    sıradadır.
+    """
+    n_courses = shards[0]['courses']
+    results = {key: np.concatenate([shard[key].reshape(n_courses, -1) for shard in shards], axis=1).ravel()
+               for key in ('scores', 'alive', 'y', 'velocity')}
+    results['frames'] = max(shard['frames'] for shard in shards)
+    results['courses'] = n_courses
+    return results
+
+class ParallelEvaluator:
+    """Bir nesli birden fazla süreçte değerlendirir.
+
+    Popülasyon parçalara bölünür ve her parça aynı tohumlu boru parkurunda ayrı
+    bir işçi süreçte simüle edilir. Genom matrisi her nesilde pickle yerine
+    paylaşılan belleğe kopyalanır, işçiler sadece skor, hayatta olma, y ve hız
+    dizilerini geri gönderir.
+    """
+    def __init__(self, workers, fast=False, engine='numpy'):
+        self.workers = workers
+        self.fast = fast  # İşçilerde olay odaklı ilerletme (VectorFlappyBird.fast_step)
+        self.engine = engine  # İşçilerin kullandığı headless motor (jit_engine.create_engine)
+        # İşçiler üst süreçle aynı kaynak izleyiciyi paylaşsın, yoksa her biri
+        # paylaşılan belleği sızmış sanıp kapanışta silmeye çalışır
+        resource_tracker.ensure_running()
+        self.pool = mp.Pool(processes=workers)
+        self.shm = None
+        self.shape = None
+
+    def _publish(self, network):
+        """Genom matrisini paylaşılan belleğe yaz (gerekirse bloğu yeniden oluştur)"""
+        genomes = network.genomes
+        # Blok sadece büyümesi gerektiğinde yeniden oluşturulur (önbellek yüzünden
+        # değerlendirilen popülasyonun boyutu nesilden nesile değişebilir)
+        if self.shm is None or genomes.nbytes > self.shm.size:
+            self._release()
+            self.shm = shared_memory.SharedMemory(create=True, size=max(genomes.nbytes, 1))
+        self.shape = genomes.shape
+
+        target = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+        target[...] = genomes
+
+    def evaluate(self, network, seed, max_steps):
+        """PopulationNetwork'ü değerlendir, birleştirilmiş sonuçları döndür
+        
+        seed bir tohum listesiyse her parça tüm parkurlarda değerlendirilir ve
+        sonuçlar VectorFlappyBird ile aynı (parkur, kuş) sırasında birleştirilir.
+        """
+        self._publish(network)
+
+        bounds = np.linspace(0, len(network), self.workers + 1).astype(int)
+        layer_sizes = (network.input_size, network.hidden_size, network.output_size)
+        tasks = [(self.shm.name, self.shape, layer_sizes, int(start), int(stop), seed, max_steps, self.fast,
+                  self.engine)
+                 for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+        return merge_shards(self.pool.starmap(_evaluate_shard, tasks))
+
+    def _release(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+            self.shape = None
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self._release()
@@ -0,0 +1,163 @@
+"""Sıcak yol ölçümü: isimli zamanlayıcılar, sayaçlar ve örnekleyici profil çıkarıcı.
+
+Ölçülecek metotlar @hook('isim') ile işaretlenir. Dekoratör fonksiyonu
+değiştirmeden döndürür, bu yüzden ölçüm kapalıyken hiçbir ek maliyet yoktur.
+enable() işaretli metotları süre ve çağrı sayısı tutan sarmalayıcılarla
+değiştirir, disable() asıllarını geri koyar. Süreler kapsayıcıdır (iç içe
+zamanlayıcıların süresi dıştakine de dahildir).
+
+SamplingProfiler ana iş parçacığının çağrı yığınını düzenli aralıklarla
+örnekler ve flamegraph.pl / speedscope ile okunabilen katlanmış yığın
+(folded stacks) biçiminde yazar.
+
+Not: enable() sadece o ana kadar içe aktarılmış modüllerdeki kancaları etkiler
+ve sadece çağrıldığı süreçte geçerlidir (paralel işçiler ölçülmez).
+"""
+import collections
+import functools
+import os
+import sys
+import threading
+import time
+from artifacts import ensure_dir
+
+_hooks = []  # (modül, nitelikli ad, zamanlayıcı adı)
+_originals = {}  # (sahip, nitelik adı) -> asıl fonksiyon
+
+timers = {}  # zamanlayıcı adı -> [toplam süre, çağrı sayısı]
+counters = collections.Counter()
+enabled = False
+_enabled_at = None
+
+def hook(name):
+    """Metodu isimli bir zamanlayıcı olarak işaretle (fonksiyon değişmeden döner)"""
+    def mark(function):
+        _hooks.append((function.__module__, function.__qualname__, name))
+        return function
+    return mark
+
+def _timed(function, name):
+    stats = timers.setdefault(name, [0.0, 0])
+    perf_counter = time.perf_counter
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats[0] += perf_counter() - start
+            stats[1] += 1
+    return wrapper
+
+_timed_wrapper_code = _timed(lambda: None, '_').__code__
+timers.pop('_')
+
+def enable():
+    """İçe aktarılmış modüllerdeki tüm kancaları zamanlayıcılarla sar"""
+    global enabled, _enabled_at
+    if enabled:
+        return
+    for module_name, qualname, name in _hooks:
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        *path, attribute = qualname.split('.')
+        owner = module
+        for part in path:
+            owner = getattr(owner, part)
+        original = owner.__dict__[attribute]
+        _originals[(owner, attribute)] = original
+        setattr(owner, attribute, _timed(original, name))
+    enabled = True
+    _enabled_at = time.perf_counter()
+
+def disable():
+    """Asıl metotları geri koy (toplanan süreler korunur)"""
+    global enabled
+    for (owner, attribute), original in _originals.items():
+        setattr(owner, attribute, original)
+    _originals.clear()
+    enabled = False
+
+def reset():
+    """Toplanan süreleri ve sayaçları sıfırla"""
+    global _enabled_at
+    for stats in timers.values():
+        stats[0], stats[1] = 0.0, 0
+    counters.clear()
+    if enabled:
+        _enabled_at = time.perf_counter()
+
+def count(name, n=1):
+    """İsimli sayacı artır (sadece ölçüm açıkken)"""
+    if enabled:
+        counters[name] += n
+
+def report():
+    """Zamanlayıcı ve sayaçların döküm tablosunu metin olarak döndür"""
+    wall = time.perf_counter() - _enabled_at if _enabled_at else 0.0
+    lines = [f"{'Zamanlayıcı':<28}{'Çağrı':>12}{'Toplam (s)':>13}{'Çağrı başı (µs)':>17}{'Süre %':>9}"]
+    for name, (total, calls) in sorted(timers.items(), key=lambda item: item[1][0], reverse=True):
+        if calls == 0:
+            continue
+        share = 100 * total / wall if wall > 0 else 0.0
+        lines.append(f"{name:<28}{calls:>12}{total:>13.3f}{1e6 * total / calls:>17.1f}{share:>8.1f}%")
+    lines.append(f"{'(duvar saati)':<28}{'':>12}{wall:>13.3f}")
+    for name, value in sorted(counters.items()):
+        lines.append(f"{name:<28}{value:>12}")
+    return '\n'.join(lines)
+
+class SamplingProfiler:
+    """Bir iş parçacığının yığınını interval saniyede bir örnekleyen profil çıkarıcı"""
+    def __init__(self, interval=0.001, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.samples = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _label(frame):
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                # Zamanlayıcı sarmalayıcıları yığında gösterilmez
+                if frame.f_code is not _timed_wrapper_code:
+                    stack.append(self._label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write_folded(self, path):
+        """Örnekleri 'çerçeve;çerçeve;... sayı' satırları olarak yaz (flamegraph girdisi)"""
+        ensure_dir(os.path.dirname(path))
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, samples in self.samples.most_common():
+                f.write(f"{stack} {samples}\n")
+        return path
+
+    def top_functions(self, n=10):
+        """En çok örneklenen (kendi süresi en yüksek) n fonksiyon: [(çerçeve, oran)]"""
+        leaves = collections.Counter()
+        for stack, samples in self.samples.items():
+            leaves[stack.rsplit(';', 1)[-1]] += samples
+        total = sum(leaves.values()) or 1
+        return [(frame, samples / total) for frame, samples in leaves.most_common(n)]
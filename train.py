@@ -4,9 +4,18 @@ import argparse
 import random
 import numpy as np
 from tqdm import tqdm
-import matplotlib.pyplot as plt
 from game import Bird, FlappyBird, GameMode
-from neural_network import NeuralNetwork, EvolutionaryAlgorithm
+from neural_network import NeuralNetwork, EvolutionaryAlgorithm, plot_fitness
+import model_io
+from jit_engine import ENGINES, create_engine
+from parallel import ParallelEvaluator
+from distributed import DistributedEvaluator, run_worker
+from islands import IslandModel, island_settings
+from artifacts import ArtifactWriter, ensure_dir
+from checkpoint import CHECKPOINT_FILE, CheckpointWriter, load_checkpoint
+from metrics import open_metrics_sink
+from fitness_cache import EvaluationCache
+import profiling
 
 def create_bird_with_brain(x, y, brain):
     """Sinir ağı ile kontrol edilen bir kuş oluşturur"""
@@ -53,8 +62,17 @@ def display_best_model(model, max_steps=None):
     game.close()
 
 def train_headless(generations=100, population_size=100, max_steps=1000, 
-                  save_interval=10, render_best=False, render_interval=10):
-    """Headless modda AI eğitimi yapar (görselleştirme olmadan)"""
+                  save_interval=10, render_best=False, render_interval=10, workers=1, seed=None,
+                  crossover_rate=0.0, early_stop=False, fast_forward=False,
+                  checkpoint_interval=None, resume=False, checkpoint_dir='checkpoints',
+                  metrics_paths=('logs/metrics.jsonl',), profile=False, cache_size=10000,
+                  courses=1, fixed_courses=False, fitness_aggregate='mean', fitness_quantile=0.25,
+                  engine='numpy', serve=None, local_workers=0, batch_size=256):
+    """Headless modda AI eğitimi yapar (görselleştirme olmadan, parametreler için train.py --help)"""
+    # Genomlar, çaprazlama ve mutasyon numpy'nin global akışını kullanır
+    if seed is not None:
+        np.random.seed(seed)
+    
     # Evrimsel algoritmayı başlat
     evolution = EvolutionaryAlgorithm(
         population_size=population_size,
@@ -63,64 +81,183 @@ def train_headless(generations=100, population_size=100, max_steps=1000,
         output_size=1,
         mutation_rate=0.2,
         mutation_amount=0.3,
-        survival_rate=0.3
+        survival_rate=0.3,
+        crossover_rate=crossover_rate,
+        fitness_aggregate=fitness_aggregate,
+        fitness_quantile=fitness_quantile
     )
     
     # Çıktı dizinlerini oluştur
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
-    if not os.path.exists('models'):
-        os.makedirs('models')
-    if not os.path.exists('plots'):
-        os.makedirs('plots')
+    for directory in ('logs', 'models', 'plots'):
+        ensure_dir(directory)
+    
+    # Headless motoru başlat (GameMode.HEADLESS ile aynı sonuçlar)
+    game = create_engine(engine)
+    if early_stop and not hasattr(game, 'ranking_decided'):
+        print("Derlenmiş motor erken bitirmeyi desteklemiyor, --early_stop yok sayılıyor")
+        early_stop = False
+    if serve:
+        evaluator = DistributedEvaluator(serve, batch_size=batch_size, local_workers=local_workers,
+                                         engine=engine, fast=fast_forward)
+        print(f"İşçiler için dinleniyor: {evaluator.address}")
+    elif workers > 1:
+        evaluator = ParallelEvaluator(workers, fast=fast_forward, engine=engine)
+    else:
+        evaluator = None
+    if early_stop and (courses > 1 or evaluator is not None):
+        print("Erken bitirme sadece tek süreçli, tek parkurlu değerlendirmede çalışır, --early_stop yok sayılıyor")
+        early_stop = False
+    # Erken bitirilen nesillerde de kuş sonuçları tam simülasyonla aynıdır, önbellek açık kalır
+    cache = EvaluationCache(cache_size) if cache_size else None
     
-    # Headless modda oyunu başlat
-    game = FlappyBird(mode=GameMode.HEADLESS)
+    # Parkur tohumları için ayrı rastgele akış (kuş/ağ oluşturma etkilemez)
+    course_seeds = random.Random(seed)
+    fixed_seeds = [course_seeds.getrandbits(32) for _ in range(courses)] if fixed_courses else None
     
     # Eğitim döngüsü
     start_time = time.time()
     best_score = 0
+    start_generation = 0
+    
+    # Kontrol noktaları
+    if checkpoint_interval is None:
+        checkpoint_interval = save_interval
+    checkpoint_path = os.path.join(checkpoint_dir, CHECKPOINT_FILE)
+    if resume:
+        if os.path.exists(checkpoint_path):
+            state = load_checkpoint(checkpoint_path)
+            evolution.set_state(state)
+            course_seeds.setstate((3, tuple(int(word) for word in state['course_rng']), None))
+            if fixed_seeds is not None and 'fixed_course_seeds' in state:
+                fixed_seeds = [int(course_seed) for course_seed in state['fixed_course_seeds']]
+            best_score = int(state['best_score'])
+            start_generation = evolution.generation
+            print(f"Kontrol noktasından devam ediliyor: Nesil {start_generation}")
+        else:
+            print(f"Kontrol noktası bulunamadı ({checkpoint_path}), eğitim baştan başlıyor")
+    checkpoints = CheckpointWriter(checkpoint_path) if checkpoint_interval else None
+    artifacts = ArtifactWriter()
+    metric_sinks = [open_metrics_sink(path) for path in metrics_paths]
+    
+    def training_state():
+        state = evolution.get_state()
+        state['course_rng'] = np.array(course_seeds.getstate()[1], dtype=np.uint64)
+        state['best_score'] = np.int64(best_score)
+        if fixed_seeds is not None:
+            state['fixed_course_seeds'] = np.array(fixed_seeds, dtype=np.uint64)
+        return state
+    
+    # Profil çıkarma (kapalıyken ölçülen metotlara dokunulmaz)
+    sampler = None
+    if profile:
+        profiling.reset()
+        profiling.enable()
+        sampler = profiling.SamplingProfiler().start()
     
     # Nesiller için ilerleme çubuğu
-    for generation in tqdm(range(generations), desc="Eğitim Nesilleri"):
-        # Sinir ağı beyinleri ile kuşlar oluştur
-        birds = []
-        for i in range(population_size):
-            brain = evolution.population[i]
-            birds.append(create_bird_with_brain(100, 300, brain))
-        
-        # Oyunu yeni kuşlarla sıfırla
-        game.reset(birds=birds)
+    for generation in tqdm(range(start_generation, generations), desc="Eğitim Nesilleri",
+                           initial=start_generation, total=generations):
+        # Bu nesil için tohumlu boru parkurları (tüm parçalar aynı parkurları görür)
+        if fixed_seeds is not None:
+            course_seed = fixed_seeds if courses > 1 else fixed_seeds[0]
+        elif courses > 1:
+            course_seed = [course_seeds.getrandbits(32) for _ in range(courses)]
+        else:
+            course_seed = course_seeds.getrandbits(32)
+        generation_start = time.perf_counter()
         
         # Tüm kuşlar ölene veya maksimum adım sayısına ulaşılana kadar bu nesli çalıştır
-        for step in range(max_steps):
-            # Oyunu bir adım ilerlet
-            _, _, done = game.step()
-            
-            # Tüm kuşlar öldüyse bu nesli sonlandır
-            if done:
-                break
+        def simulate(network):
+            if evaluator:
+                return evaluator.evaluate(network, course_seed, max_steps)
+            if courses > 1:
+                game.reset(network, seeds=course_seed)
+            else:
+                game.reset(network, seed=course_seed)
+            game.run(max_steps, top_k=evolution.survivors_count() if early_stop else None,
+                     fast=fast_forward)
+            return game.results()
+        
+        network = evolution.population_network()
+        if cache is not None:
+            cache.reset_stats()
+            context = (tuple(course_seed) if courses > 1 else course_seed, max_steps)
+            results = cache.evaluate(network, context, simulate, courses=courses)
+        else:
+            results = simulate(network)
+        
+        simulate_end = time.perf_counter()
+        
+        generation_score = int(results['scores'].max())
+        profiling.count('frames', int(results['frames']))
+        profiling.count('bird_evaluations', len(network))
         
         # En iyi skoru güncelle
-        if game.score > best_score:
-            best_score = game.score
+        if generation_score > best_score:
+            best_score = generation_score
             print(f"Yeni en iyi skor: {best_score} (Nesil {generation})")
         
-        # Bir sonraki nesli oluştur
-        evolution.create_next_generation(birds)
+        # Bir sonraki nesli oluştur (uygunluk ve seçim sonuç dizileri üzerinden)
+        evolution.create_next_generation_from_results(results)
+        evolve_end = time.perf_counter()
         
         # Periyodik olarak en iyi modeli kaydet
         if (generation + 1) % save_interval == 0:
-            model_path = evolution.save_best_model()
-            print(f"En iyi model kaydedildi: {model_path}")
+            model_path = evolution.save_best_model(writer=artifacts)
+            print(f"En iyi model kaydediliyor: {model_path}")
             
             # Uygunluk grafiğini kaydet
             plot_path = os.path.join('plots', f'fitness_gen_{generation}.png')
-            evolution.plot_fitness_history(save_path=plot_path)
+            evolution.plot_fitness_history(save_path=plot_path, writer=artifacts)
         
         # İsteğe bağlı olarak periyodik olarak en iyi modeli görselleştir
         if render_best and (generation + 1) % render_interval == 0:
             display_best_model(evolution.best_model)
+        
+        # Periyodik kontrol noktası (arka planda yazılır)
+        if checkpoints and (generation + 1) % checkpoint_interval == 0:
+            checkpoints.submit(training_state())
+        
+        # Nesil metrikleri
+        if metric_sinks:
+            generation_end = time.perf_counter()
+            simulate_time = simulate_end - generation_start
+            record = {
+                'generation': generation,
+                'best_fitness': float(evolution.fitness_history[-1]),
+                'avg_fitness': float(evolution.avg_fitness_history[-1]),
+                'median_fitness': float(np.median(evolution.last_fitness)),
+                'best_score': generation_score,
+                'frames': int(results['frames']),
+                'survivors': int(results['alive'].sum()),
+                'simulate_time': simulate_time,
+                'evolve_time': evolve_end - simulate_end,
+                'save_time': generation_end - evolve_end,
+                'total_time': generation_end - generation_start,
+                'birds_per_sec': len(network) / simulate_time if simulate_time > 0 else 0.0,
+                'cache_hits': cache.hits if cache is not None else 0,
+                'cache_misses': cache.misses if cache is not None else len(network),
+                'cache_hit_rate': cache.hit_rate() if cache is not None else 0.0,
+            }
+            for sink in metric_sinks:
+                sink.write(record)
+    
+    for sink in metric_sinks:
+        sink.close()
+    
+    if sampler:
+        sampler.stop()
+        profiling.disable()
+        print(profiling.report())
+        print("En çok örneklenen fonksiyonlar:")
+        for frame, share in sampler.top_functions():
+            print(f"  {100 * share:5.1f}%  {frame}")
+        print(f"Katlanmış yığınlar: {sampler.write_folded(os.path.join('logs', 'profile.folded'))}")
+    if evaluator:
+        evaluator.close()
+    if checkpoints:
+        checkpoints.submit(training_state())
+        checkpoints.close()
     
     # Eğitim tamamlandı
     total_time = time.time() - start_time
@@ -129,16 +266,64 @@ def train_headless(generations=100, population_size=100, max_steps=1000,
     
     # Son uygunluk grafiğini kaydet
     plot_path = os.path.join('plots', f'fitness_final.png')
-    evolution.plot_fitness_history(save_path=plot_path)
+    evolution.plot_fitness_history(save_path=plot_path, writer=artifacts)
     
-    # En son modeli kaydet
-    final_model_path = evolution.save_best_model()
+    # En son modeli kaydet ve bekleyen tüm yazmaların bitmesini bekle
+    final_model_path = evolution.save_best_model(writer=artifacts)
+    artifacts.close()
     print(f"Son model kaydedildi: {final_model_path}")
     
     return evolution.best_model
 
-def run_visualized_training(generations=20, population_size=50, max_steps=1000):
-    """Görselleştirme ile eğitim yapar"""
+def train_islands(generations=100, population_size=100, max_steps=1000, islands=4, migration_interval=10,
+                  migrants=2, seed=None, engine='numpy', crossover_rate=0.0):
+    """Ada modeliyle eğitim: her ada ayrı bir süreçte evrilir, adalar periyodik olarak göç eder
+    
+    population_size ada başına popülasyondur. Her migration_interval nesilde bir
+    her adanın en iyi migrants genomu halkadaki bir sonraki adaya gönderilir.
+    Sonunda tüm adalardaki en iyi model kaydedilir.
+    """
+    for directory in ('models', 'plots'):
+        ensure_dir(directory)
+    
+    settings = island_settings(islands, seed)
+    for index, setting in enumerate(settings):
+        print(f"Ada {index}: mutasyon oranı {setting['mutation_rate']:.2f}, "
+              f"mutasyon miktarı {setting['mutation_amount']:.2f}")
+    model = IslandModel(settings, population_size=population_size, max_steps=max_steps,
+                        migration_interval=migration_interval, migrants=migrants, engine=engine,
+                        crossover_rate=crossover_rate)
+    
+    def report(states):
+        scores = ', '.join(str(state['best_score']) for state in states)
+        print(f"Nesil {states[0]['generation']} - Ada en iyi skorları: {scores}")
+    
+    start_time = time.time()
+    results = model.run(generations, on_epoch=report)
+    best_model, best_island = IslandModel.best(results)
+    
+    print(f"Eğitim tamamlandı! Toplam süre: {time.time() - start_time:.2f} saniye")
+    print(f"En iyi skor: {max(result['best_score'] for result in results)} (Ada {best_island})")
+    
+    # Adaların birleşik uygunluk grafiği (en iyi adalar ve ada ortalamalarının ortalaması)
+    fitness_history = np.max([result['fitness_history'] for result in results], axis=0)
+    avg_fitness_history = np.mean([result['avg_fitness_history'] for result in results], axis=0)
+    plot_fitness(fitness_history, avg_fitness_history, os.path.join('plots', 'fitness_islands.png'))
+    
+    if best_model:
+        model_path = os.path.join('models', 'best_models' + model_io.MODEL_EXTENSION)
+        model_io.append_genomes(model_path, best_model.genome, (8, 24, 1), labels=[generations])
+        print(f"Son model kaydedildi: {model_path}")
+    
+    return best_model
+
+def run_visualized_training(generations=20, population_size=50, max_steps=1000, render_every=1):
+    """Görselleştirme ile eğitim yapar
+    
+    render_every > 1 ise sadece her render_every karede bir çizim yapılır (ve
+    FPS sınırı sadece o karelerde uygulanır); simülasyon aradaki kareleri
+    çizmeden ilerletir.
+    """
     # Görselleştirme için pygame'i içe aktar
     import pygame
     
@@ -172,16 +357,17 @@ def run_visualized_training(generations=20, population_size=50, max_steps=1000):
         step = 0
         
         while running and step < max_steps:
-            # Pygame olaylarını işle
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                    pygame.quit()
-                    return
-            
             # Oyunu bir adım ilerlet
             _, _, done = game.step()
-            game.render()
+            
+            # Sadece çizilen karelerde olayları işle ve ekranı güncelle
+            if step % render_every == 0 or done:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+                        pygame.quit()
+                        return
+                game.render()
             
             # Tüm kuşlar öldüyse bu nesli sonlandır
             if done:
@@ -208,7 +394,8 @@ def play_human():
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Flappy Bird AI Eğitici')
     parser.add_argument('--mode', type=str, default='train_headless', 
-                        choices=['train_headless', 'train_visual', 'play_human', 'play_ai'],
+                        choices=['train_headless', 'train_islands', 'train_visual', 'play_human', 'play_ai',
+                                 'evaluate'],
                         help='Programın çalıştırılacağı mod')
     parser.add_argument('--generations', type=int, default=100, 
                         help='Eğitilecek nesil sayısı')
@@ -217,19 +404,89 @@ if __name__ == "__main__":
     parser.add_argument('--max_steps', type=int, default=1000,
                         help='Her nesil için maksimum adım sayısı')
     parser.add_argument('--model', type=str, default=None,
-                        help='Kullanılacak önceden eğitilmiş model yolu')
+                        help='Kullanılacak önceden eğitilmiş model yolu (.fbnn veya eski .pkl)')
+    parser.add_argument('--model_index', type=int, default=-1,
+                        help='.fbnn dosyasında kullanılacak kayıt (varsayılan: son kaydedilen model)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Headless eğitimde nesil değerlendirmesi için süreç sayısı')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Genomlar ve boru parkurları için rastgele tohum (tekrarlanabilir eğitim)')
+    parser.add_argument('--crossover_rate', type=float, default=0.0,
+                        help='Headless eğitimde çocukların çaprazlama ile üretilme oranı')
+    parser.add_argument('--early_stop', action='store_true',
+                        help='En iyi kuşların sıralaması kesinleşince kalan tek kuşu olay odaklı bitir (aynı sonuçlar; '
+                             'tek süreçli, tek parkurlu headless eğitim; jit motorunda yok sayılır)')
+    parser.add_argument('--fast_forward', action='store_true',
+                        help='Headless simülasyonu olay odaklı ilerlet (aynı sonuçlar, uzun nesillerde daha hızlı)')
+    parser.add_argument('--checkpoint_interval', type=int, default=None,
+                        help='Kaç nesilde bir kontrol noktasının arka planda atomik olarak yazılacağı '
+                             '(varsayılan: kayıt aralığı, 0: kapalı)')
+    parser.add_argument('--metrics', type=str, nargs='*', default=['logs/metrics.jsonl'],
+                        help='Nesil metriklerinin ekleneceği dosyalar (.jsonl veya ikili .fbm; boş: kapalı)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Sıcak yol zamanlayıcıları ve örnekleyici profil çıkarıcı ile eğit (döküm tablosu + logs/profile.folded)')
+    parser.add_argument('--cache_size', type=int, default=10000,
+                        help='Genom ve parkura göre önbelleklenecek en fazla kuş sonucu; bilinen genomlar yeniden '
+                             'simüle edilmez (0: kapalı)')
+    parser.add_argument('--courses', type=int, default=1,
+                        help='Her genomun her nesilde değerlendirileceği parkur sayısı (toplu simülasyon)')
+    parser.add_argument('--fixed_courses', action='store_true',
+                        help='Parkurları her nesil yeniden çekmek yerine eğitim boyunca aynı parkurları kullan')
+    parser.add_argument('--fitness_aggregate', type=str, default='mean', choices=['mean', 'min', 'quantile'],
+                        help='Çoklu parkur uygunluğunun birleştirilme yöntemi')
+    parser.add_argument('--fitness_quantile', type=float, default=0.25,
+                        help="--fitness_aggregate quantile için kullanılacak yüzdelik (0-1)")
+    parser.add_argument('--serve', type=str, default=None,
+                        help='Nesilleri bu adrese bağlanan işçilere (--mode evaluate) --batch_size genomluk yığınlarla '
+                             'dağıt (tcp://host:port veya unix:///yol; --workers yerine)')
+    parser.add_argument('--local_workers', type=int, default=0,
+                        help='--serve ile bu makinede başlatılacak işçi süreç sayısı')
+    parser.add_argument('--batch_size', type=int, default=256,
+                        help='--serve ile bir işçiye tek seferde gönderilen genom sayısı')
+    parser.add_argument('--connect', type=str, default=None,
+                        help='--mode evaluate: bağlanılacak koordinatör adresi')
+    parser.add_argument('--islands', type=int, default=4,
+                        help='Ada modelinde ada (süreç) sayısı; --population ada başına popülasyondur')
+    parser.add_argument('--migration_interval', type=int, default=10,
+                        help='Ada modelinde kaç nesilde bir göç yapılacağı')
+    parser.add_argument('--migrants', type=int, default=2,
+                        help='Her göçte bir adadan komşusuna gönderilen en iyi genom sayısı')
+    parser.add_argument('--render_every', type=int, default=1,
+                        help='Görsel eğitimde kaç karede bir çizim yapılacağı (büyük değerler daha hızlı eğitir)')
+    parser.add_argument('--engine', type=str, default='numpy', choices=ENGINES,
+                        help='Headless simülasyon motoru (jit: numba ile derlenmiş, aynı sonuçlar; numba yoksa numpy)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Headless eğitime checkpoints/ altındaki son kontrol noktasından birebir aynı sonuçlarla devam et')
     
     args = parser.parse_args()
     
     if args.mode == 'train_headless':
-        train_headless(generations=args.generations, population_size=args.population, max_steps=args.max_steps)
+        train_headless(generations=args.generations, population_size=args.population, max_steps=args.max_steps,
+                       workers=args.workers, seed=args.seed, crossover_rate=args.crossover_rate,
+                       early_stop=args.early_stop, fast_forward=args.fast_forward,
+                       checkpoint_interval=args.checkpoint_interval, resume=args.resume,
+                       metrics_paths=args.metrics, profile=args.profile,
+                       cache_size=args.cache_size, courses=args.courses, fixed_courses=args.fixed_courses,
+                       fitness_aggregate=args.fitness_aggregate, fitness_quantile=args.fitness_quantile,
+                       engine=args.engine, serve=args.serve, local_workers=args.local_workers,
+                       batch_size=args.batch_size)
+    elif args.mode == 'evaluate':
+        if args.connect:
+            run_worker(args.connect, engine=args.engine)
+        else:
+            print("Lütfen --connect ile koordinatör adresini belirtin")
+    elif args.mode == 'train_islands':
+        train_islands(generations=args.generations, population_size=args.population, max_steps=args.max_steps,
+                      islands=args.islands, migration_interval=args.migration_interval, migrants=args.migrants,
+                      seed=args.seed, engine=args.engine, crossover_rate=args.crossover_rate)
     elif args.mode == 'train_visual':
-        run_visualized_training(generations=args.generations, population_size=args.population, max_steps=args.max_steps)
+        run_visualized_training(generations=args.generations, population_size=args.population, max_steps=args.max_steps,
+                                render_every=args.render_every)
     elif args.mode == 'play_human':
         play_human()
     elif args.mode == 'play_ai':
         if args.model:
-            model = NeuralNetwork.load(args.model)
+            model = NeuralNetwork.load(args.model, index=args.model_index)
             display_best_model(model)
         else:
             print("Lütfen --model ile bir model yolu belirtin")
@@ -0,0 +1,204 @@
+"""Harici ajanlar (DQN vb.) için Gym tarzı vektörleştirilmiş Flappy Bird ortamı.
+
+FlappyVectorEnv N bağımsız alt ortamı (her birinde tek kuş ve kendi boru
+parkuru) NumPy dizileriyle aynı anda ilerletir:
+
+    env = FlappyVectorEnv(num_envs=256, seed=0)
+    observations = env.reset()                     # (N, 8)
+    observations, rewards, dones = env.step(actions)  # actions: (N,) 0/1
+
+Gözlemler Bird.apply_brain / VectorFlappyBird.sense ile aynı 8 girdidir ve
+FlappyBird.step'te olduğu gibi o karede hareket etmiş borulara göre
+hesaplanır; bu yüzden evrimsel algoritmanın ağları ile harici ajanlar aynı
+girdileri görür ve aynı parkur tohumuyla FlappyBird ile kare kare aynı oyunu
+oynar. Biten alt ortamlar aynı step çağrısında yeni bir parkurla otomatik
+olarak sıfırlanır; o satırın döndürülen gözlemi yeni bölümün ilk gözlemidir.
+
+Boruların x konumları ortamın kare sayacından hesaplanır (tüm borular aynı
+hızla hareket eder ve sabit aralıklarla eklenir), boşluk yükseklikleri ise
+alt ortam başına küçük bir halka tablosunda tutulur. Kare başına sözlük veya
+nesne oluşturulmaz; maliyet birkaç dizi işlemidir.
+"""
+import random
+import numpy as np
+from profiling import hook
+from game import (PipeCourse, GRAVITY, JUMP_STRENGTH, BIRD_WIDTH, BIRD_HEIGHT, BIRD_MAX_Y,
+                  PIPE_WIDTH, PIPE_SPEED, PIPE_GAP_HEIGHT, PIPE_SPAWN_INTERVAL)
+
+OBSERVATION_SIZE = 8
+ACTION_COUNT = 2  # 0: bekle, 1: zıpla
+
+# Ödüller (FlappyBird.step ile aynı ölçek; yere düşmek de ölüm cezası alır)
+REWARD_ALIVE = 0.1
+REWARD_PASS = 1.0
+REWARD_DEATH = -1.0
+
+class FlappyVectorEnv:
+    """N bağımsız Flappy Bird alt ortamı için toplu reset/step arayüzü
+
+    step(actions) (gözlemler (N, 8), ödüller (N,), bitti (N,)) döndürür.
+    Bir alt ortam kuş öldüğünde ya da max_steps kareye ulaşıldığında biter;
+    truncated dizisi son step'te sadece kare sınırıyla biten satırları
+    işaretler. Biten bölümlerin skor ve kare sayıları episode_scores ve
+    episode_lengths dizilerine yazılır. Her bölümün parkur tohumu
+    course_seeds dizisindedir (FlappyBird(seed=...) ile aynı parkur).
+    """
+    observation_size = OBSERVATION_SIZE
+    action_count = ACTION_COUNT
+
+    def __init__(self, num_envs, width=800, bird_x=100, bird_y=300, max_steps=None, seed=None):
+        if num_envs < 1:
+            raise ValueError('Alt ortam sayısı en az 1 olmalı')
+        self.num_envs = num_envs
+        self.width = width
+        self.bird_x = bird_x
+        self.bird_y = bird_y
+        self.max_steps = max_steps
+        # Bir alt ortamda aynı anda ekranda olabilecek boru sayısı (PipeRing ile aynı)
+        self.capacity = int(np.ceil((width + PIPE_WIDTH) / (PIPE_SPEED * PIPE_SPAWN_INTERVAL))) + 1
+
+        self.rows = np.arange(num_envs)
+        self.y = np.empty(num_envs)
+        self.velocity = np.empty(num_envs)
+        self.frame = np.zeros(num_envs, dtype=np.int64)  # Oynanacak karenin numarası
+        self.scores = np.zeros(num_envs, dtype=np.int64)  # Aynı zamanda geçiş imleci
+        self.next_pipe = np.zeros(num_envs, dtype=np.int64)  # Önündeki ilk borunun sırası
+        self.pending_pass = np.zeros(num_envs, dtype=bool)  # Bu karede geçilen boru
+        self.gaps = np.zeros((num_envs, self.capacity))  # Boşluk merkezleri, boru sırası % capacity
+        self.courses = [None] * num_envs
+        self.course_seeds = np.zeros(num_envs, dtype=np.int64)
+
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        self.episode_scores = np.zeros(num_envs, dtype=np.int64)
+        self.episode_lengths = np.zeros(num_envs, dtype=np.int64)
+        self.episodes = 0  # Biten bölüm sayısı
+        self.seeds = random.Random(seed)
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Tüm alt ortamları yeni parkurlarla sıfırla, ilk gözlemleri döndür
+
+        seed verilirse parkur tohumları (otomatik sıfırlamalarınkiler dahil)
+        bu tohumdan türetilir ve aynı eylemler her zaman aynı sonuçları verir.
+        """
+        if seed is not None:
+            self.seeds = random.Random(seed)
+        self.truncated[:] = False
+        self.episode_scores[:] = 0
+        self.episode_lengths[:] = 0
+        self.episodes = 0
+        self._restart(self.rows)
+        self._advance()
+        return self._observe()
+
+    def _restart(self, rows):
+        """Verilen alt ortamlarda yeni bölüm başlat (kare 0, ilk boru eklenmiş)"""
+        self.y[rows] = float(self.bird_y)
+        self.velocity[rows] = 0.0
+        self.frame[rows] = 0
+        self.scores[rows] = 0
+        self.next_pipe[rows] = 0
+        for i in rows:
+            course_seed = self.seeds.getrandbits(32)
+            self.courses[i] = PipeCourse(course_seed)
+            self.course_seeds[i] = course_seed
+            self.gaps[i, 0] = self.courses[i].next_gap()
+
+    def _pipe_x(self, index, frame):
+        """index. borunun frame. karedeki x konumu (hareket ettirildikten sonra)
+
+        İlk boru reset'te (kare 0), diğerleri eklendikleri karede hareketten
+        önce eklenir; bu yüzden ilk boru bir kare fazla hareket etmiş olur.
+        """
+        moves = frame - PIPE_SPAWN_INTERVAL * index + (index > 0)
+        return self.width - PIPE_SPEED * moves
+
+    @hook('env.advance')
+    def _advance(self):
+        """Tüm alt ortamları bir sonraki kareye geçir: boru ekle, imleçleri ilerlet"""
+        self.frame += 1
+
+        # Yeni borular (alt ortamların kare sayaçları farklı olabilir)
+        spawning = np.flatnonzero(self.frame % PIPE_SPAWN_INTERVAL == 0)
+        if len(spawning):
+            index = self.frame[spawning] // PIPE_SPAWN_INTERVAL
+            self.gaps[spawning, index % self.capacity] = [self.courses[i].next_gap() for i in spawning]
+
+        # Kuş sütununu geçen borular (kare başına en fazla bir tane)
+        self.pending_pass = self.bird_x > self._pipe_x(self.scores, self.frame) + PIPE_WIDTH
+
+        # Önde kalmayan boru imleçten çıkar
+        self.next_pipe += self._pipe_x(self.next_pipe, self.frame) + PIPE_WIDTH <= self.bird_x
+
+    @hook('env.observe')
+    def _observe(self):
+        """Her alt ortam için (N, 8) gözlem matrisi (Bird.apply_brain ile aynı girdiler)"""
+        y = self.y
+        next_x = self._pipe_x(self.next_pipe, self.frame)
+        next_gap = self.gaps[self.rows, self.next_pipe % self.capacity]
+
+        observations = np.empty((self.num_envs, OBSERVATION_SIZE))
+        observations[:, 0] = y / 400  # Normalize edilmiş y konumu
+        observations[:, 1] = self.velocity / 10  # Normalize edilmiş hız
+        observations[:, 2] = (next_x - self.bird_x) / 400  # Boruya yatay mesafe
+        observations[:, 3] = (y - next_gap) / 200  # Boşluk merkezine göre yükseklik
+        observations[:, 4] = (y - (next_gap - PIPE_GAP_HEIGHT / 2)) / 200  # Üst boruya mesafe
+        observations[:, 5] = ((next_gap + PIPE_GAP_HEIGHT / 2) - y) / 200  # Alt boruya mesafe
+
+        # İkinci boru henüz eklenmediyse varsayılan değerler (uzak mesafe, nötr yükseklik)
+        second = self.next_pipe + 1
+        has_second = second <= self.frame // PIPE_SPAWN_INTERVAL
+        second_gap = self.gaps[self.rows, second % self.capacity]
+        observations[:, 6] = np.where(has_second, (self._pipe_x(second, self.frame) - self.bird_x) / 400, 1.0)
+        observations[:, 7] = np.where(has_second, (y - second_gap) / 200, 0.0)
+        return observations
+
+    @hook('env.step')
+    def step(self, actions):
+        """Her alt ortamda bir kare oyna: (gözlemler, ödüller, bitti) döndür
+
+        actions, N uzunluğunda 0/1 (veya bool) dizisidir; 1 zıplamadır.
+        """
+        jumps = np.asarray(actions) != 0
+        if jumps.shape != (self.num_envs,):
+            raise ValueError(f'actions {self.num_envs} uzunluğunda olmalı, gelen şekil: {jumps.shape}')
+
+        # Fizik (Bird.jump ve Bird.update ile aynı işlemler)
+        velocity = np.where(jumps, float(JUMP_STRENGTH), self.velocity) + GRAVITY
+        y = self.y + velocity
+        ceiling = y < 0
+        y[ceiling] = 0
+        velocity[ceiling] = 0
+        self.y = y
+        self.velocity = velocity
+
+        # Bu karede geçilen boru karenin başında yaşayan kuşa sayılır
+        passed = self.pending_pass
+        self.scores += passed
+
+        # Yere düşme ve kuş sütunundaki boruyla (sadece önündeki ilk boru olabilir) çarpışma
+        pipe_x = self._pipe_x(self.next_pipe, self.frame)
+        gap_y = self.gaps[self.rows, self.next_pipe % self.capacity]
+        overlapping = (self.bird_x + BIRD_WIDTH > pipe_x) & (self.bird_x < pipe_x + PIPE_WIDTH)
+        dead = (y >= BIRD_MAX_Y) | (overlapping & ((y < gap_y - PIPE_GAP_HEIGHT // 2) |
+                                                   (y + BIRD_HEIGHT > gap_y + PIPE_GAP_HEIGHT // 2)))
+
+        rewards = np.where(passed, REWARD_PASS, REWARD_ALIVE)
+        rewards[dead] = REWARD_DEATH
+
+        if self.max_steps is not None:
+            self.truncated = ~dead & (self.frame >= self.max_steps)
+            dones = dead | self.truncated
+        else:
+            dones = dead
+
+        # Biten alt ortamları kaydet ve yeni parkurla sıfırla
+        if dones.any():
+            finished = np.flatnonzero(dones)
+            self.episode_scores[finished] = self.scores[finished]
+            self.episode_lengths[finished] = self.frame[finished]
+            self.episodes += len(finished)
+            self._restart(finished)
+
+        self._advance()
+        return self._observe(), rewards, dones
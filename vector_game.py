@@ -0,0 +1,499 @@
+import numpy as np
+from neural_network import PopulationNetwork
+from profiling import hook
+from game import (Bird, PipeCourse, GRAVITY, JUMP_STRENGTH, BIRD_WIDTH, BIRD_HEIGHT, BIRD_MAX_Y,
+                  PIPE_WIDTH, PIPE_SPEED, PIPE_GAP_HEIGHT, PIPE_SPAWN_INTERVAL)
+
+class VectorFlappyBird:
+    """Tüm popülasyonu dizi işlemleriyle ilerleten headless oyun motoru.
+
+    FlappyBird.step her kuşu ayrı bir nesne olarak ilerletirken bu motor kuşların
+    y konumunu, hızını, hayatta olma durumunu ve skorunu NumPy dizilerinde tutar.
+    Aynı boru dizisi için GameMode.HEADLESS ile aynı sonuçları üretir. Tüm kuşların
+    aynı x konumunda olduğu varsayılır (eğitimde her zaman 100).
+
+    reset(..., seeds=[...]) ile popülasyon K parkurda aynı anda değerlendirilir.
+    Boruların x konumları, eklenme zamanları ve geçilmeleri tüm parkurlarda
+    aynıdır, sadece boşluk yükseklikleri farklıdır; bu yüzden boru durumu
+    (K, boru) boyutlu tek bir boşluk matrisiyle tutulur ve (parkur x kuş)
+    satırları tek bir toplu simülasyonda ilerler.
+    """
+
+    def __init__(self, width=800, height=600, bird_x=100, bird_y=300, seed=None, gaps=None,
+                 lookahead=32, window_budget=1024, fast_max_birds=128):
+        self.course = PipeCourse(seed, gaps)
+        self.courses = [self.course]
+        self.lookahead = lookahead  # fast_step'in tek seferde değerlendirdiği en fazla kare
+        self.window_budget = window_budget  # fast_step'te pencere başına hedeflenen kuş-kare sayısı
+        self.fast_max_birds = fast_max_birds  # run(fast=True) bundan fazla kuş yaşarken step kullanır
+        self.width = width
+        self.height = height
+        self.bird_x = bird_x
+        self.bird_y = bird_y
+        self.reset([])
+
+    def reset(self, brains, seed=None, seeds=None):
+        """Oyunu verilen beyinlerle sıfırla
+        
+        brains bir NeuralNetwork listesi ya da tüm popülasyonu tutan bir
+        PopulationNetwork olabilir; simülasyon her iki durumda da toplu
+        ileri besleme kullanır. seed verilirse mevcut parkurun yerine bu tohumla
+        yeni bir PipeCourse kullanılır; aynı tohum her zaman aynı parkuru verir.
+        
+        seeds (K tohum) verilirse her beyin K parkurun her birinde ayrı bir kuş
+        olarak oynar: kuş dizileri parkur sırasıyla K * N uzunluğundadır
+        (c. parkurdaki i. beyin c * N + i. satır).
+        """
+        if isinstance(brains, PopulationNetwork):
+            self.brains = None
+            self.network = brains
+        else:
+            self.brains = brains
+            self.network = PopulationNetwork.from_networks(brains) if len(brains) else None
+        self.game_over = False
+        self.score = 0
+        self.frame_count = 0
+        if seeds is not None:
+            self.courses = [PipeCourse(course_seed) for course_seed in seeds]
+            self.course = self.courses[0]
+        elif seed is not None:
+            self.course = PipeCourse(seed)
+            self.courses = [self.course]
+        for course in self.courses:
+            course.reset()
+
+        # Birden fazla parkurda her beyin parkur başına bir kez tekrarlanır
+        n_courses = len(self.courses)
+        if n_courses > 1 and self.network is not None:
+            self.network = PopulationNetwork(np.tile(self.network.genomes, (n_courses, 1)),
+                                             self.network.input_size, self.network.hidden_size,
+                                             self.network.output_size)
+        n = len(self.network) if self.network is not None else 0
+
+        # Kuş durumları (yapı-dizisi düzeni); y ve hız yaşayan kuşlar için
+        # results() çağrılana kadar live_* dizilerinde tutulur
+        self.y = np.full(n, float(self.bird_y))
+        self.velocity = np.zeros(n)
+        self.alive = np.ones(n, dtype=bool)
+        self.scores = np.zeros(n, dtype=np.int64)
+        self.living_birds = n
+
+        # Yaşayan kuşların sıkıştırılmış durumu: kuşlar öldükçe küçülür, böylece
+        # kare başına maliyet başlangıç popülasyonuna değil hayatta kalanlara bağlıdır
+        self.live_idx = np.arange(n)
+        self.live_y = self.y.copy()
+        self.live_velocity = self.velocity.copy()
+        self.live_network = self.network
+        self._ranking_changed = False
+
+        # Her kuşun parkuru (tek parkurda hepsi 0)
+        self.course_idx = np.repeat(np.arange(n_courses), n // n_courses if n_courses else 0)
+        self.live_course = self.course_idx.copy()
+
+        # Boru durumları (ekranda en fazla birkaç boru olur); boşluklar (parkur, boru)
+        self.pipe_x = np.empty(0)
+        self.pipe_gap_y = np.empty((n_courses, 0))
+        self.pipe_passed = np.empty(0, dtype=bool)
+        self.add_pipe()
+
+    def add_pipe(self):
+        gaps = [[float(course.next_gap())] for course in self.courses]
+        self.pipe_x = np.append(self.pipe_x, float(self.width))
+        self.pipe_gap_y = np.append(self.pipe_gap_y, gaps, axis=1)
+        self.pipe_passed = np.append(self.pipe_passed, False)
+
+    def _gap(self, j, course):
+        """j. borunun boşluk merkezi: tek parkurda sayı, aksi halde kuş başına (course) dizi"""
+        if len(self.courses) == 1:
+            return self.pipe_gap_y[0, j]
+        return self.pipe_gap_y[course, j]
+
+    def sense(self):
+        """Yaşayan kuşlar için sinir ağı girdilerini (L, 8) matris olarak döndür
+        
+        Sonraki iki boru tüm kuşlar için kare başına bir kez bulunur, girdiler
+        Bird.apply_brain ile aynı normalizasyonla yayınlama (broadcasting) ile hesaplanır.
+        Önde boru yoksa None döndürür.
+        """
+        return self._features(self.live_y, self.live_velocity, course=self.live_course)
+
+    @hook('vector.features')
+    def _features(self, y, velocity, shift=0, course=None):
+        """y ve hız dizileri için (..., 8) girdi dizisi; borular shift piksel daha sola kaymış kabul edilir
+        
+        course, y'nin ilk ekseni boyunca her kuşun parkur indeksidir.
+        """
+        # Sonraki iki boruyu bul (tüm kuşlar aynı x konumunda)
+        ahead = np.flatnonzero(self.pipe_x + PIPE_WIDTH > self.bird_x)
+        if len(ahead) == 0:
+            return None
+        next_x = self.pipe_x[ahead[0]] - shift
+        next_gap = self._course_column(self._gap(ahead[0], course), y)
+
+        inputs = np.empty(np.shape(y) + (8,))
+        inputs[..., 0] = y / 400  # Normalize edilmiş y konumu
+        inputs[..., 1] = velocity / 10  # Normalize edilmiş hız
+        inputs[..., 2] = (next_x - self.bird_x) / 400  # Boruya yatay mesafe
+        inputs[..., 3] = (y - next_gap) / 200  # Boşluk merkezine göre yükseklik
+        inputs[..., 4] = (y - (next_gap - PIPE_GAP_HEIGHT / 2)) / 200  # Üst boruya mesafe
+        inputs[..., 5] = ((next_gap + PIPE_GAP_HEIGHT / 2) - y) / 200  # Alt boruya mesafe
+
+        # İkinci boru yoksa varsayılan değerler (uzak mesafe, nötr yükseklik)
+        if len(ahead) > 1:
+            inputs[..., 6] = ((self.pipe_x[ahead[1]] - shift) - self.bird_x) / 400
+            inputs[..., 7] = (y - self._course_column(self._gap(ahead[1], course), y)) / 200
+        else:
+            inputs[..., 6] = 1.0
+            inputs[..., 7] = 0.0
+
+        return inputs
+
+    @staticmethod
+    def _course_column(gap, y):
+        """Kuş başına boşluk dizisini y'nin (kuş, kare) şekline yayınlanabilir yap"""
+        if np.ndim(gap) and np.ndim(y) > 1:
+            return gap[:, np.newaxis]
+        return gap
+
+    @hook('vector.decide')
+    def _decide(self):
+        """Yaşayan kuşlar için zıplama kararlarını döndür"""
+        inputs = self.sense()
+        if inputs is None:
+            return np.zeros(len(self.live_idx), dtype=bool)
+
+        # Tüm yaşayan kuşlar için tek bir toplu ileri besleme
+        return self.live_network.decide(inputs)
+
+    @hook('vector.compact')
+    def _compact(self, dead):
+        """Ölen kuşların son durumunu kaydet ve onları yaşayan dizilerden çıkar"""
+        dead_idx = self.live_idx[dead]
+        self.y[dead_idx] = self.live_y[dead]
+        self.velocity[dead_idx] = self.live_velocity[dead]
+        self.alive[dead_idx] = False
+        self.living_birds -= len(dead_idx)
+
+        keep = ~dead
+        self.live_idx = self.live_idx[keep]
+        self.live_y = self.live_y[keep]
+        self.live_velocity = self.live_velocity[keep]
+        self.live_course = self.live_course[keep]
+        self.live_network = self.live_network.take(keep)
+
+    @hook('vector.pipes')
+    def _advance_pipes(self):
+        """Kare sayacını artır, gerekirse boru ekle, boruları hareket ettir"""
+        self.frame_count += 1
+
+        # Yeni boru ekle
+        if self.frame_count % PIPE_SPAWN_INTERVAL == 0:
+            self.add_pipe()
+
+        # Boruları hareket ettir ve ekrandan çıkanları sil
+        self.pipe_x -= PIPE_SPEED
+        self._remove_offscreen_pipes()
+
+    def _remove_offscreen_pipes(self):
+        on_screen = self.pipe_x > -PIPE_WIDTH
+        if not on_screen.all():
+            self.pipe_x = self.pipe_x[on_screen]
+            self.pipe_gap_y = self.pipe_gap_y[:, on_screen]
+            self.pipe_passed = self.pipe_passed[on_screen]
+
+    @hook('vector.passes')
+    def _credit_passes(self):
+        """Bu karede geçilen boruları karenin başında yaşayan tüm kuşlara say"""
+        newly_passed = ~self.pipe_passed & (self.bird_x > self.pipe_x + PIPE_WIDTH)
+        if newly_passed.any() and len(self.live_idx):
+            self.pipe_passed |= newly_passed
+            self.scores[self.live_idx] += int(newly_passed.sum())
+            self.score = max(self.score, int(self.scores[self.live_idx].max()))
+            self._ranking_changed = True
+
+    @hook('vector.step')
+    def step(self):
+        """Oyunu bir kare ilerlet, tüm kuşlar öldüyse True döndür"""
+        self._advance_pipes()
+
+        if len(self.live_idx) == 0:
+            self.game_over = True
+            return True
+
+        # Sinir ağı kararları ve fizik (yerçekimi, tavan sınırı)
+        y = self._physics(self._decide())
+
+        # Yere düşenler
+        dead = y >= BIRD_MAX_Y
+
+        # Boru geçişleri
+        self._credit_passes()
+
+        # Borularla çarpışma kontrolü
+        dead |= self._collisions(y)
+
+        if dead.any():
+            self._compact(dead)
+            self._ranking_changed = True
+
+        done = self.living_birds <= 0
+        self.game_over = done
+        return done
+
+    @hook('vector.physics')
+    def _physics(self, jumps):
+        """Zıplama kararlarını, yerçekimini ve tavan sınırını uygula, yeni y dizisini döndür"""
+        velocity = np.where(jumps, float(JUMP_STRENGTH), self.live_velocity) + GRAVITY
+        y = self.live_y + velocity
+        ceiling = y < 0
+        y[ceiling] = 0
+        velocity[ceiling] = 0
+        self.live_y = y
+        self.live_velocity = velocity
+        return y
+
+    @hook('vector.collision')
+    def _collisions(self, y):
+        """Kuş sütunuyla çakışan borulara çarpan kuşların maskesi"""
+        hit = np.zeros(len(y), dtype=bool)
+        overlapping = np.flatnonzero((self.bird_x + BIRD_WIDTH > self.pipe_x) &
+                                     (self.bird_x < self.pipe_x + PIPE_WIDTH))
+        for j in overlapping:
+            gap_y = self._gap(j, self.live_course)
+            hit |= (y < gap_y - PIPE_GAP_HEIGHT // 2) | (y + BIRD_HEIGHT > gap_y + PIPE_GAP_HEIGHT // 2)
+        return hit
+
+    def _chunk_length(self, limit):
+        """Boru düzeninin (öndeki borular, geçişler, yeni boru) değişmediği kare sayısı
+        
+        Şu anki kareden sonraki ilk kare dahil sayılır; o karede gerçekleşen
+        boru ekleme ve geçişler zaten işlenmiş olur.
+        """
+        length = limit
+
+        # Sonraki boru ekleme karesi
+        next_spawn = (self.frame_count // PIPE_SPAWN_INTERVAL + 1) * PIPE_SPAWN_INTERVAL
+        length = min(length, next_spawn - self.frame_count)
+
+        # Önde kalma sınırı: x + genişlik <= kuş x olduğunda boru girdilerden çıkar
+        edge = self.pipe_x + PIPE_WIDTH - self.bird_x
+        ahead = edge > 0
+        if ahead.any():
+            length = min(length, int(np.ceil(edge[ahead] / PIPE_SPEED).min()))
+
+        # Geçiş sınırı: kuş x > x + genişlik olduğunda boru geçilmiş sayılır
+        waiting = ~self.pipe_passed & (edge >= 0)
+        if waiting.any():
+            length = min(length, int((edge[waiting] // PIPE_SPEED).min()) + 1)
+
+        return max(1, length)
+
+    def _pipe_limits(self, length):
+        """Her parkur ve kare için çarpışmasız y aralığını (üst sınır, alt sınır) döndür, (K, kareler)"""
+        shifts = PIPE_SPEED * np.arange(length)
+        x = self.pipe_x[:, np.newaxis] - shifts  # (borular, kareler)
+        overlapping = (self.bird_x + BIRD_WIDTH > x) & (self.bird_x < x + PIPE_WIDTH)
+        gap_y = self.pipe_gap_y[:, :, np.newaxis]  # (parkurlar, borular, 1)
+        top = np.where(overlapping, gap_y - PIPE_GAP_HEIGHT // 2, -np.inf).max(axis=1, initial=-np.inf)
+        bottom = np.where(overlapping, gap_y + PIPE_GAP_HEIGHT // 2, np.inf).min(axis=1, initial=np.inf)
+        return top, bottom
+
+    @hook('vector.fast_step')
+    def fast_step(self, max_frames):
+        """Kareleri olay odaklı olarak toplu ilerlet, ilerletilen kare sayısını döndür
+        
+        Boru düzeninin değişmediği bir aralık boyunca her kuşun balistik yörüngesi
+        (zıplamadan) kümülatif toplamlarla hesaplanır ve sinir ağı aralıktaki tüm
+        kareler için tek seferde değerlendirilir. Her kuş bir sonraki olayına
+        (zıplama, tavan, ölüm veya aralık sonu) doğrudan atlar; olay karesi step ile
+        aynı işlemlerle hesaplanır. Kümülatif toplamlar sıralı toplama yaptığı için
+        sonuçlar step ile kare kare aynıdır.
+        
+        Pencere uzunluğu, pencere başına yaklaşık window_budget kuş-kare
+        değerlendirilecek şekilde aktif kuş sayısından seçilir (en fazla
+        lookahead): az kuşta geniş pencereler Python ek yükünü azaltır, çok
+        kuşta kısa pencereler olaydan sonraki boşa giden ağ hesaplarını sınırlar.
+        """
+        self._advance_pipes()
+        if len(self.live_idx) == 0:
+            self.game_over = True
+            return 1
+
+        self._credit_passes()
+        length = self._chunk_length(max_frames)
+        top, bottom = self._pipe_limits(length)
+        has_pipe = np.any(self.pipe_x + PIPE_WIDTH > self.bird_x)
+
+        y = self.live_y.copy()
+        velocity = self.live_velocity.copy()
+        offset = np.zeros(len(y), dtype=np.int64)  # Her kuşun işlenmiş kare sayısı
+        dead = np.zeros(len(y), dtype=bool)
+        active = np.arange(len(y))
+        network = self.live_network
+
+        while len(active):
+            width = 1 << max(0, int(self.window_budget // len(active)).bit_length() - 1)
+            remaining = min(length - offset[active].min(), self.lookahead, width)
+            frames = offset[active, np.newaxis] + np.arange(remaining)  # Aralık içi kare indeksleri
+            valid = frames < length
+            frames = np.minimum(frames, length - 1)
+            course = self.live_course[active]
+
+            # Zıplamasız yörünge (sıralı kümülatif toplam, step ile aynı yuvarlama)
+            steps = np.full((len(active), remaining + 1), GRAVITY)
+            steps[:, 0] = velocity[active]
+            v_path = np.cumsum(steps, axis=1)
+            steps[:, 0] = y[active]
+            steps[:, 1:] = v_path[:, 1:]
+            y_path = np.cumsum(steps, axis=1)
+
+            # Her karenin girdileri karenin başındaki duruma göre hesaplanır
+            if has_pipe:
+                inputs = self._features(y_path[:, :-1], v_path[:, :-1], PIPE_SPEED * frames, course)
+                # Sıkıştırılmış ağ sadece aktif kuşlar değiştiğinde yeniden oluşturulur
+                if len(network) != len(active):
+                    network = self.live_network.take(active)
+                jumps = network.predict(inputs) > 0.5
+            else:
+                jumps = np.zeros(frames.shape, dtype=bool)
+
+            y_next = y_path[:, 1:]
+            top_frames = top[course[:, np.newaxis], frames]
+            bottom_frames = bottom[course[:, np.newaxis], frames]
+            crashed = (y_next >= BIRD_MAX_Y) | (y_next < top_frames) | (y_next + BIRD_HEIGHT > bottom_frames)
+            event = (jumps | (y_next < 0) | crashed | (frames == length - 1)) & valid
+            event[:, -1] |= valid[:, -1]  # Pencere sonu da bir olay noktasıdır
+            first = event.argmax(axis=1)
+
+            # Olay karesini step ile aynı şekilde hesapla
+            rows = np.arange(len(active))
+            v_new = np.where(jumps[rows, first], float(JUMP_STRENGTH), v_path[rows, first]) + GRAVITY
+            y_new = y_path[rows, first] + v_new
+            ceiling = y_new < 0
+            y_new[ceiling] = 0
+            v_new[ceiling] = 0
+            frame = frames[rows, first]
+            died = (y_new >= BIRD_MAX_Y) | (y_new < top[course, frame]) | (y_new + BIRD_HEIGHT > bottom[course, frame])
+
+            y[active] = y_new
+            velocity[active] = v_new
+            offset[active] += first + 1
+            dead[active[died]] = True
+            active = active[~died & (offset[active] < length)]
+
+        self.live_y = y
+        self.live_velocity = velocity
+
+        # Tüm kuşlar öldüyse oyun son ölüm karesinde biter
+        if dead.all():
+            length = int(offset.max())
+
+        # Aralığın kalan karelerinde boruları ilerlet
+        self.frame_count += length - 1
+        self.pipe_x -= PIPE_SPEED * (length - 1)
+        self._remove_offscreen_pipes()
+
+        if dead.any():
+            self._compact(dead)
+            self._ranking_changed = True
+
+        done = self.living_birds <= 0
+        self.game_over = done
+        return length
+
+    @hook('vector.ranking')
+    def ranking_decided(self, top_k):
+        """En iyi top_k kuşun sıralaması artık değişemiyorsa True döndür
+        
+        Ölü kuşların uygunluğu ve aralarındaki sıra sabittir. İki kuş hâlâ
+        yaşıyorsa hangisinin daha çok boru geçeceği bilinemez, bu yüzden sıralama
+        en fazla bir kuş yaşarken kesinleşebilir. Tek yaşayan kuşun skoru tüm ölü
+        kuşlarınkinden kesin olarak yüksekse, ne zaman ölürse ölsün birinci
+        kalır; aksi halde skoru eşit veya yüksek ölü kuşlara göre yeri değişebilir.
+        Bu koşul top_k'dan bağımsızdır: yaşayan kuş her zaman ilk top_k'ya
+        girebileceği için daha gevşek bir sınır yoktur.
+        """
+        living = len(self.live_idx)
+        if living == 0 or top_k < 1:
+            return True
+        if living > 1:
+            return False
+
+        dead_scores = self.scores[~self.alive]
+        return len(dead_scores) == 0 or self.scores[self.live_idx[0]] > dead_scores.max()
+
+    def run(self, max_steps, top_k=None, fast=False):
+        """Tüm kuşlar ölene veya maksimum adım sayısına ulaşılana kadar oyna
+        
+        top_k verilirse, en iyi top_k kuşun sıralaması kesinleştiğinde (en fazla
+        bir kuş yaşarken) kalan kuş fast_step ile olay odaklı olarak sonuna kadar
+        ilerletilir; kare başına adım atılmaz ama uygunluğu, seçim ve en iyi model
+        tam simülasyonla aynıdır.
+        fast açıksa kareler fast_step ile olay odaklı ilerletilir; sonuçlar aynıdır,
+        erken bitirme kontrolü ise aralık sonlarında yapılır. fast_max_birds'ten
+        fazla kuş yaşarken ağ hesabı baskın olduğundan (olay odaklı ilerletme
+        kare başına birden fazla ileri besleme yapar) kareler step ile ilerletilir.
+        """
+        frames = 0
+        while frames < max_steps:
+            self._ranking_changed = False
+            if fast and len(self.live_idx) <= self.fast_max_birds:
+                frames += self.fast_step(max_steps - frames)
+            else:
+                self.step()
+                frames += 1
+            if self.game_over:
+                break
+            if top_k is not None and self._ranking_changed and self.ranking_decided(top_k):
+                # Kalan tek kuşun skoru ve durumu uygunluğa girer, bu yüzden kesilmez
+                while frames < max_steps and not self.game_over:
+                    frames += self.fast_step(max_steps - frames)
+                break
+        return self.score
+
+    def results(self):
+        """Uygunluk hesabı için gereken son durumu diziler olarak döndür"""
+        # Yaşayan kuşların güncel durumunu tam dizilere yaz
+        self.y[self.live_idx] = self.live_y
+        self.velocity[self.live_idx] = self.live_velocity
+        return {
+            'scores': self.scores,
+            'alive': self.alive,
+            'y': self.y,
+            'velocity': self.velocity,
+            'frames': self.frame_count,
+            'courses': len(self.courses),
+        }
+
+    def to_birds(self):
+        """Son durumu EvolutionaryAlgorithm için Bird nesnelerine aktar"""
+        brains = self.brains if self.brains is not None else self.network.to_networks()
+        return make_birds(brains, self.results(), self.bird_x)
+
+
+def make_birds(brains, results, bird_x=100):
+    """Simülasyon sonuçlarından (results()) Bird nesneleri oluştur
+    
+    Sonuçlar K parkurdan geliyorsa her kuşa parkur başına skorlar (course_scores)
+    ve hayatta olma durumları (course_alive) eklenir; score en iyi parkurdaki
+    skor, alive herhangi bir parkurda hayatta olmasıdır.
+    """
+    n_courses = results.get('courses', 1)
+    if n_courses > 1:
+        course_scores = results['scores'].reshape(n_courses, -1)
+        course_alive = results['alive'].reshape(n_courses, -1)
+
+    birds = []
+    for i, brain in enumerate(brains):
+        bird = Bird(bird_x, float(results['y'][i]), brain=brain)
+        bird.velocity = float(results['velocity'][i])
+        if n_courses > 1:
+            bird.course_scores = course_scores[:, i]
+            bird.course_alive = course_alive[:, i]
+            bird.alive = bool(bird.course_alive.any())
+            bird.score = int(bird.course_scores.max())
+        else:
+            bird.alive = bool(results['alive'][i])
+            bird.score = int(results['scores'][i])
+        birds.append(bird)
+    return birds